@@ -0,0 +1,1006 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import glob
+import io
+import gzip
+import hashlib
+import html
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import resource
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import feedparser
+import requests
+import yaml
+
+from radar.bloom import BloomFrontStore
+from radar.extract import extract_many
+from radar.fetch import download_feed, fetch_html, parse_feed
+from radar.run import main as run_main
+from radar.score import ScoreResult, compile_rules, score_batch
+from radar.session import configure_http, close_session
+from radar.state import JsonStateStore, _upgrade_v1, load_state
+
+try:
+    import brotli
+except ImportError:  # optional decoder; gzip is always available
+    brotli = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.count("requests")
+        if self.server.latency_sec:
+            time.sleep(self.server.latency_sec)
+        route = self.server.routes.get(self.path.split("?", 1)[0])
+        if route is None:
+            body = b"not found"
+            self.send_response(404)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        content_type, body = route
+        accept = self.headers.get("Accept-Encoding", "")
+        encoding = None
+        if self.server.compress:
+            if "br" in accept and brotli is not None:
+                body, encoding = brotli.compress(body), "br"
+            elif "gzip" in accept:
+                body, encoding = gzip.compress(body), "gzip"
+        self.server.count("bytes_sent", len(body))
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Local HTTP/1.1 keep-alive server answering from a {path: (content_type, body)}
+    map (anything with .get). Counts accepted TCP connections (one handshake
+    each) and requests; latency_ms delays every response.
+    """
+    daemon_threads = True
+
+    def __init__(self, routes: Dict[str, Tuple[str, bytes]], compress: bool = False, latency_ms: int = 0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.routes = routes
+        self.compress = compress
+        self.latency_sec = max(0, latency_ms) / 1000.0
+        self.counters: Dict[str, int] = {"connections": 0, "requests": 0, "bytes_sent": 0}
+        self._counter_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._counter_lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def process_request(self, request, client_address):
+        self.count("connections")
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset_counters(self) -> None:
+        with self._counter_lock:
+            for k in self.counters:
+                self.counters[k] = 0
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def _article_html(i: int) -> bytes:
+    paras = "".join(
+        f"<p>Paragraph {j} of article {i}. Officials described the claims as disinformation "
+        f"while state media repeated the patriotic duty line for a domestic audience.</p>"
+        for j in range(12)
+    )
+    return f"<html><head><title>Article {i}</title></head><body><article>{paras}</article></body></html>".encode()
+
+
+def bench_http(n_requests: int, n_hosts: int, pool_connections: int, pool_maxsize: int, compress: bool) -> Dict[str, Any]:
+    servers: List[StandInServer] = []
+    for _ in range(max(1, n_hosts)):
+        routes = {f"/articles/{i}": ("text/html; charset=utf-8", _article_html(i)) for i in range(n_requests)}
+        servers.append(StandInServer(routes, compress=compress).start())
+    urls = [f"{servers[i % len(servers)].base_url}/articles/{i}" for i in range(n_requests)]
+    ua = "PropagandaRadar/bench"
+
+    def totals() -> Dict[str, int]:
+        return {k: sum(s.counters[k] for s in servers) for k in ("connections", "requests", "bytes_sent")}
+
+    try:
+        t0 = time.perf_counter()
+        for u in urls:
+            r = requests.get(u, headers={"User-Agent": ua}, timeout=10)
+            r.raise_for_status()
+            _ = r.text
+        unpooled_sec = time.perf_counter() - t0
+        unpooled = totals()
+        for s in servers:
+            s.reset_counters()
+
+        configure_http(pool_connections, pool_maxsize)
+        t0 = time.perf_counter()
+        for u in urls:
+            fetch_html(u, 10, ua)
+        pooled_sec = time.perf_counter() - t0
+        pooled = totals()
+        close_session()
+    finally:
+        for s in servers:
+            s.stop()
+
+    return {
+        "benchmark": "http",
+        "requests": n_requests,
+        "hosts": len(servers),
+        "compress": compress,
+        "unpooled": {**unpooled, "seconds": round(unpooled_sec, 4)},
+        "pooled": {**pooled, "seconds": round(pooled_sec, 4)},
+        "handshakes_saved": unpooled["connections"] - pooled["connections"],
+    }
+
+
+def load_report_items(pattern: str = "out/daily/daily_*.md") -> List[Dict[str, str]]:
+    """Recover title/link/published/excerpt of every item from rendered daily reports."""
+    items: List[Dict[str, str]] = []
+    for path in sorted(glob.glob(pattern)):
+        cur: Optional[Dict[str, str]] = None
+        in_excerpt = False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("### ") and "](" in line:
+                    head, link = line.rsplit("](", 1)
+                    cur = {"title": head.split(". [", 1)[-1], "link": link.rstrip(")"), "published": "", "excerpt": ""}
+                    items.append(cur)
+                    in_excerpt = False
+                elif cur is None:
+                    continue
+                elif line.startswith("- Published: "):
+                    cur["published"] = line[len("- Published: "):]
+                elif line == "**Excerpt**":
+                    in_excerpt = True
+                elif line == "---":
+                    in_excerpt = False
+                elif in_excerpt and line:
+                    cur["excerpt"] = (cur["excerpt"] + "\n\n" + line) if cur["excerpt"] else line
+    return items
+
+
+def report_article_html(item: Dict[str, str]) -> bytes:
+    """A news-site-like page (navigation, article paragraphs, footer) around a recorded excerpt."""
+    paras = [p for p in item["excerpt"].split("\n\n") if p.strip()] or [item["title"]]
+    # the reports flatten long articles into one line; split it back into paragraph-sized chunks
+    chunks: List[str] = []
+    for p in paras:
+        sentences = p.split(". ")
+        for i in range(0, len(sentences), 3):
+            chunks.append(". ".join(sentences[i:i + 3]))
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(25))
+    body = "".join(f"<p>{html.escape(c)}</p>" for c in chunks)
+    page = (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(item['title'])}</title></head>"
+        f"<body><header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><article><h1>{html.escape(item['title'])}</h1>"
+        f"<time datetime=\"2026-01-20T20:18:43Z\">{html.escape(item.get('published', ''))}</time>{body}</article>"
+        f"<aside><h2>More stories</h2><ul>{nav}</ul></aside></main>"
+        f"<footer><p>Copyright. All rights reserved.</p><ul>{nav}</ul></footer></body></html>"
+    )
+    return page.encode("utf-8")
+
+
+def _reference_score_item(title, summary, body, keywords, context_rules, mode="aggressive") -> ScoreResult:
+    # The original per-keyword implementation, kept as the oracle for the compiled scorer.
+    def count(text, term):
+        if not text or not term:
+            return 0
+        return text.lower().count(term.lower())
+
+    title = title or ""
+    summary = summary or ""
+    body = body or ""
+    blob = f"{title}\n{summary}\n{body}".strip()
+    aggressive = (mode or "").lower() == "aggressive"
+    total = 0
+    mk, mr = [], []
+    for kw in (keywords or []):
+        term = str(kw.get("term", "")).strip()
+        if not term:
+            continue
+        w = int(kw.get("weight", 1))
+        c_title = count(title, term)
+        c_other = count(summary + "\n" + body, term)
+        c = c_title + c_other
+        if c <= 0:
+            continue
+        if aggressive:
+            part = (c_title * w * 3) + (c_other * w)
+            if c_title > 0:
+                part += 2
+        else:
+            part = c * w
+        part = min(part, w * 12 + (3 if aggressive else 0))
+        total += part
+        mk.append((term, w, c))
+    for rule in (context_rules or []):
+        name = str(rule.get("name", "rule")).strip()
+        patterns = rule.get("patterns", []) or []
+        w = int(rule.get("weight", 1))
+        match_mode = str(rule.get("match", "any")).lower()
+        hits = 0
+        for p in patterns:
+            p = str(p).strip()
+            if p and (p.lower() in blob.lower()):
+                hits += 1
+        ok = (hits > 0) if match_mode == "any" else (hits == len(patterns) and len(patterns) > 0)
+        if ok:
+            add = w * (2 if aggressive else 1)
+            total += add
+            mr.append((name, add))
+    return ScoreResult(score=int(total), matched_keywords=mk, matched_rules=mr)
+
+
+def _random_rules(rng: random.Random, texts: List[str], n_keywords: int, n_rules: int):
+    words = [w for t in texts for w in t.split() if w]
+    joins = [t[max(0, i - 6): i + 8] for t in texts for i in range(len(t)) if t[i] == "\n"][:500] or ["a\nb"]
+
+    def term() -> str:
+        kind = rng.random()
+        if kind < 0.4:
+            t = rng.choice(words)
+        elif kind < 0.6:
+            i = rng.randrange(len(words) - 1)
+            t = words[i] + " " + words[i + 1]
+        elif kind < 0.8:
+            w = rng.choice(words)
+            t = w[: rng.randint(1, max(1, len(w)))]  # prefixes overlap other terms
+        elif kind < 0.9:
+            t = rng.choice(joins)  # straddles a line break, possibly the summary/body join
+        else:
+            t = rng.choice(["aa", "ana", "e", "the", "propaganda", "  traitor ", "", "\n"])
+        return t.upper() if rng.random() < 0.2 else t
+
+    keywords = [{"term": term(), "weight": rng.randint(1, 6)} for _ in range(n_keywords)]
+    rules = [
+        {
+            "name": f"rule{i}",
+            "patterns": [term() for _ in range(rng.randint(0, 4))],
+            "weight": rng.randint(1, 4),
+            "match": rng.choice(["any", "all", "ALL"]),
+        }
+        for i in range(n_rules)
+    ]
+    return keywords, rules
+
+
+def bench_score(n_keywords: int, n_rules: int, rounds: int, seed: int) -> Dict[str, Any]:
+    """
+    Property check + timing: random keyword/rule sets drawn from real report
+    text must score every item identically with the compiled, incremental
+    scorer and the original implementation, both for the RSS pass and after
+    the body is added, and through score_batch (batch_speedup is against the
+    reference's full-text pass alone).
+    """
+    items = load_report_items()
+    if not items:
+        raise SystemExit("no items found under out/daily/")
+    rng = random.Random(seed)
+    docs = []
+    for it in items:
+        text = it["excerpt"]
+        cut = rng.randint(0, len(text))
+        docs.append((it["title"], text[:cut], text[cut:]))
+    texts = [t for d in docs for t in d]
+
+    mismatches = 0
+    checked = 0
+    ref_sec = 0.0
+    compiled_sec = 0.0
+    batch_sec = 0.0
+    for _ in range(rounds):
+        keywords, rules = _random_rules(rng, texts, n_keywords, n_rules)
+        mode = rng.choice(["aggressive", "balanced", "AGGRESSIVE"])
+        # Both sides do what main() does for a fetched article: an RSS pass on
+        # title+summary, then a second score once the body is known.
+        t0 = time.perf_counter()
+        expected_rss = [_reference_score_item(t, s, "", keywords, rules, mode) for t, s, b in docs]
+        expected = [_reference_score_item(t, s, b, keywords, rules, mode) for t, s, b in docs]
+        ref_sec += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        compiled = compile_rules(keywords, rules)
+        partials = [compiled.scan(t, s) for t, s, b in docs]
+        got_rss = [compiled.finalize(p, mode) for p in partials]
+        got = [compiled.finalize(compiled.extend(p, d[2]), mode) for p, d in zip(partials, docs)]
+        compiled_sec += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        batch = score_batch(docs, compile_rules(keywords, rules), mode)
+        batch_sec += time.perf_counter() - t0
+        got_batch = [
+            ScoreResult(batch.scores[i], batch.matched_keywords(i), batch.matched_rules(i)) for i in range(len(batch))
+        ]
+        checked += 3 * len(docs)
+        mismatches += sum(1 for a, b in zip(expected_rss + expected + expected, got_rss + got + got_batch) if a != b)
+
+    return {
+        "benchmark": "score",
+        "items": len(docs),
+        "rounds": rounds,
+        "keywords": n_keywords,
+        "rules": n_rules,
+        "checked": checked,
+        "mismatches": mismatches,
+        "reference_seconds": round(ref_sec, 4),
+        "compiled_seconds": round(compiled_sec, 4),
+        "speedup": round(ref_sec / compiled_sec, 2) if compiled_sec else None,
+        "batch_seconds": round(batch_sec, 4),
+        "batch_speedup": round(ref_sec / 2 / batch_sec, 2) if batch_sec else None,
+    }
+
+
+def bench_extract(pages: int, worker_counts: List[int]) -> Dict[str, Any]:
+    items = [it for it in load_report_items() if it["excerpt"]]
+    if not items:
+        raise SystemExit("no items found under out/daily/")
+    jobs = [(items[i % len(items)]["link"] + f"#{i}", report_article_html(items[i % len(items)]).decode("utf-8")) for i in range(pages)]
+    runs = []
+    baseline = None
+    for workers in worker_counts:
+        t0 = time.perf_counter()
+        extracted = sum(1 for _, text in extract_many(iter(jobs), workers=workers) if text)
+        sec = time.perf_counter() - t0
+        baseline = baseline or sec
+        runs.append({
+            "workers": workers,
+            "seconds": round(sec, 3),
+            "pages_per_sec": round(pages / sec, 1),
+            "extracted": extracted,
+            "speedup": round(baseline / sec, 2),
+        })
+    return {"benchmark": "extract", "pages": pages, "cpu_count": os.cpu_count(), "runs": runs}
+
+
+def synthetic_seen(n: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """n seen records resembling real ones, spread over 45 days, keyed by hex stable_key."""
+    rng = random.Random(seed)
+    titles = [it["title"] for it in load_report_items()] or ["Synthetic headline about a world event"]
+    now = int(datetime.now(timezone.utc).timestamp())
+    # keep_days=45 with a 46-day spread: roughly 2% of entries are due for pruning
+    stamps = sorted(now - rng.randrange(46 * 86400) for _ in range(n))
+    seen: Dict[str, Any] = {}
+    for i, ts in enumerate(stamps):
+        seen[hashlib.sha1(f"src{i % 300}::{i}".encode()).hexdigest()] = {
+            "first_seen": ts,
+            "last_seen": ts,
+            "date": datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d"),
+            "source_id": f"source_{i % 300}",
+            "title": titles[i % len(titles)][:200],
+            "link": f"https://www.example.com/news/articles/{i:012d}?at_medium=RSS&at_campaign=rss",
+            "label": rng.choice(["GREEN", "GREEN", "GREEN", "WATCH", "RED"]),
+            "score": rng.randrange(20),
+        }
+    return seen
+
+
+def synthetic_state(seen: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """A v2 (columnar) state dict holding the given records, as JsonStateStore keeps it."""
+    return _upgrade_v1({"version": 1, "seen": seen, "telegram": {"last_sent_date": None}})
+
+
+def _timed(fn) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def _run_like(state, keys: List[str], new_keys: List[str]) -> None:
+    # what one cron run does: look up every feed entry, mark the new ones
+    for k in keys + new_keys:
+        state.is_seen(k)
+    for k in new_keys:
+        state.mark_seen(k, {"date": "2026-01-20", "source_id": "bench", "title": "t", "link": "l", "label": "GREEN", "score": 0})
+
+
+def bench_state(sizes: List[int], run_entries: int) -> Dict[str, Any]:
+    """Load / prune / one run's lookups / save for the JSON and SQLite backends at each size."""
+    results = []
+    for n in sizes:
+        tmp = tempfile.mkdtemp(prefix="radar-bench-state-")
+        try:
+            json_path = os.path.join(tmp, "state.json")
+            db_path = os.path.join(tmp, "state.sqlite")
+            seen = synthetic_seen(n)
+            JsonStateStore(json_path, synthetic_state(seen)).save()
+            keys = list(seen)[-run_entries:]
+            del seen
+            new_keys = [hashlib.sha1(f"new::{i}".encode()).hexdigest() for i in range(run_entries)]
+            _, migrate_sec = _timed(lambda: load_state(db_path).close())  # auto-migrates from state.json
+
+            row: Dict[str, Any] = {"entries": n}
+            for backend, path in (("json", json_path), ("sqlite", db_path)):
+                size = os.path.getsize(path)
+                st, load_sec = _timed(lambda: load_state(path))
+                _, prune_sec = _timed(lambda: st.prune_seen(45))
+                _, run_sec = _timed(lambda: _run_like(st, keys, new_keys))
+                _, save_sec = _timed(lambda: st.save())
+                st.close()
+                row[backend] = {
+                    "bytes": size,
+                    "load_sec": round(load_sec, 4),
+                    "prune_sec": round(prune_sec, 4),
+                    "lookups_sec": round(run_sec, 4),
+                    "save_sec": round(save_sec, 4),
+                }
+            row["sqlite"]["migrate_sec"] = round(migrate_sec, 4)
+            results.append(row)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {"benchmark": "state", "run_entries": run_entries, "results": results}
+
+
+def bench_state_format(sizes: List[int]) -> Dict[str, Any]:
+    """
+    state.json size and load time: the v1 layout as originally written (hex
+    keys, ISO timestamps, indent=2, plain json.load) against v2 with and
+    without stored titles/links.
+    """
+    results = []
+    for n in sizes:
+        tmp = tempfile.mkdtemp(prefix="radar-bench-format-")
+        try:
+            seen = synthetic_seen(n)
+            v1 = {"version": 1, "seen": {}, "telegram": {"last_sent_date": None}}
+            for k, v in seen.items():
+                v1["seen"][k] = dict(
+                    v,
+                    first_seen=datetime.fromtimestamp(v["first_seen"], timezone.utc).isoformat(),
+                    last_seen=datetime.fromtimestamp(v["last_seen"], timezone.utc).isoformat(),
+                )
+            v1_path = os.path.join(tmp, "v1.json")
+            with open(v1_path, "w", encoding="utf-8") as f:
+                json.dump(v1, f, ensure_ascii=False, indent=2)
+
+            def load_v1():
+                with open(v1_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            _, v1_load = _timed(load_v1)
+            row: Dict[str, Any] = {"entries": n, "v1": {"bytes": os.path.getsize(v1_path), "load_sec": round(v1_load, 4)}}
+
+            for variant, keep_titles in (("v2", True), ("v2_no_titles", False)):
+                if not keep_titles:
+                    for v in seen.values():
+                        v.pop("title", None)
+                        v.pop("link", None)
+                path = os.path.join(tmp, f"{variant}.json")
+                JsonStateStore(path, synthetic_state(seen)).save()
+                _, load_sec = _timed(lambda: JsonStateStore.load(path))
+                size = os.path.getsize(path)
+                row[variant] = {
+                    "bytes": size,
+                    "load_sec": round(load_sec, 4),
+                    "size_reduction": round(row["v1"]["bytes"] / size, 2),
+                    "load_speedup": round(v1_load / load_sec, 2) if load_sec else None,
+                }
+            results.append(row)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {"benchmark": "state-format", "results": results}
+
+
+def _startup_probe(code: str) -> Dict[str, Any]:
+    """Run code in a fresh interpreter; it sets `out`. Returns out plus seconds and peak RSS."""
+    script = (
+        "import json, resource, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        f"{code}\n"
+        "out['seconds'] = round(time.perf_counter() - t0, 4)\n"
+        # ru_maxrss는 fork 전 부모 값을 물려받으므로 VmHWM 우선
+        "hwm = [l for l in open('/proc/self/status') if l.startswith('VmHWM:')] if sys.platform.startswith('linux') else []\n"
+        "out['peak_rss_kb'] = int(hwm[0].split()[1]) if hwm else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(json.dumps(out))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd(), os.environ.get("PYTHONPATH", "")]))
+    res = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def bench_bloom(n: int, lookups: int, fp_rate: float) -> Dict[str, Any]:
+    """
+    Seen-membership at n keys: filter size and build time, then fresh-process
+    startup (seconds, peak RSS) and lookup cost for the JSON store, the SQLite
+    store, and SQLite behind the mapped Bloom filter.
+    """
+    tmp = tempfile.mkdtemp(prefix="radar-bench-bloom-")
+    try:
+        json_path = os.path.join(tmp, "state.json")
+        db_path = os.path.join(tmp, "state.sqlite")
+        bloom_path = db_path + ".bloom"
+        seen = synthetic_seen(n)
+        JsonStateStore(json_path, synthetic_state(seen)).save()
+        known = list(seen)[-lookups:]
+        del seen
+        load_state(db_path).close()  # migrates from state.json
+        new = [hashlib.sha1(f"new::{i}".encode()).hexdigest() for i in range(lookups)]
+
+        st = load_state(db_path)
+        bf_store, build_sec = _timed(lambda: BloomFrontStore(st, bloom_path, fp_rate=fp_rate))
+        bf_store.close()
+
+        def lookup_code(factory: str) -> str:
+            return (
+                "from radar.state import load_state\n"
+                "from radar.bloom import BloomFrontStore\n"
+                f"st = {factory}\n"
+                "t1 = time.perf_counter()\n"
+                "keys = json.load(open(KEYS))\n"
+                "t2 = time.perf_counter()\n"
+                "hits = sum(1 for k in keys['new'] if st.is_seen(k))\n"
+                "t3 = time.perf_counter()\n"
+                "known = sum(1 for k in keys['known'] if st.is_seen(k))\n"
+                "t4 = time.perf_counter()\n"
+                "out = {'open_sec': round(t1 - t0, 4), 'new_lookups_sec': round(t3 - t2, 4),\n"
+                "       'known_lookups_sec': round(t4 - t3, 4), 'new_reported_seen': hits, 'known_found': known}\n"
+                "out.update({'stats': st.stats} if hasattr(st, 'stats') else {})\n"
+            )
+
+        keys_path = os.path.join(tmp, "keys.json")
+        with open(keys_path, "w", encoding="utf-8") as f:
+            json.dump({"new": new, "known": known}, f)
+        prefix = f"KEYS = {keys_path!r}\n"
+        probes = {
+            "json": prefix + lookup_code(f"load_state({json_path!r})"),
+            "sqlite": prefix + lookup_code(f"load_state({db_path!r})"),
+            "sqlite+bloom": prefix + lookup_code(
+                f"BloomFrontStore(load_state({db_path!r}), {bloom_path!r}, fp_rate={fp_rate!r})"),
+        }
+        baseline = _startup_probe("out = {}")
+        stores = {name: _startup_probe(code) for name, code in probes.items()}
+        for r in stores.values():
+            r.pop("seconds", None)
+        return {
+            "benchmark": "bloom",
+            "keys": n,
+            "lookups": lookups,
+            "fp_rate": fp_rate,
+            "filter_bytes": os.path.getsize(bloom_path),
+            "filter_build_sec": round(build_sec, 4),
+            "state_json_bytes": os.path.getsize(json_path),
+            "interpreter_rss_kb": baseline["peak_rss_kb"],
+            "stores": stores,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class _FixtureRoutes:
+    """
+    Feeds and article pages for the pipeline benchmark, generated on request
+    from recorded report items: /feed/<s> is an RSS document listing the
+    current window of entries of source s (newest first), /a/<s>/<i> the page
+    of entry i. advance() slides every window forward by `step` entries.
+    """
+
+    def __init__(self, items: List[Dict[str, str]], n_entries: int):
+        self.items = items
+        self.n_entries = n_entries
+        self.offset = 0
+        self.base_url = ""
+        self.epoch = datetime(2026, 1, 20, tzinfo=timezone.utc)
+
+    def advance(self, step: int) -> None:
+        self.offset += step
+
+    def _item(self, s: int, i: int) -> Dict[str, str]:
+        return self.items[(s * 7919 + i) % len(self.items)]
+
+    def _feed(self, s: int) -> bytes:
+        out = [
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>',
+            f"<title>Source {s}</title><link>{self.base_url}/</link><description>bench</description>",
+        ]
+        for i in range(self.offset + self.n_entries - 1, self.offset - 1, -1):
+            it = self._item(s, i)
+            link = f"{self.base_url}/a/{s}/{i}"
+            summary = (it["excerpt"].split("\n\n", 1)[0] or it["title"])[:400]
+            published = format_datetime(self.epoch + timedelta(minutes=10 * i))
+            out.append(
+                f"<item><title>{html.escape(it['title'])}</title><link>{link}</link>"
+                f'<guid isPermaLink="true">{link}</guid><description>{html.escape(summary)}</description>'
+                f"<pubDate>{published}</pubDate></item>"
+            )
+        out.append("</channel></rss>")
+        return "".join(out).encode("utf-8")
+
+    def get(self, path: str) -> Optional[Tuple[str, bytes]]:
+        parts = path.strip("/").split("/")
+        try:
+            if len(parts) == 2 and parts[0] == "feed":
+                return "application/rss+xml; charset=utf-8", self._feed(int(parts[1]))
+            if len(parts) == 3 and parts[0] == "a":
+                return "text/html; charset=utf-8", report_article_html(self._item(int(parts[1]), int(parts[2])))
+        except ValueError:
+            return None
+        return None
+
+
+def bench_feed(n_entries: int, keep: int, page_mb: float, max_mb: float) -> Dict[str, Any]:
+    """
+    A feed of n_entries items and a page of page_mb MB, read whole (the old
+    path: body buffered, every entry parsed, then sliced) vs. streamed with
+    the item and byte caps. Peak traced memory covers download and parse.
+    """
+    items = load_report_items() or [{"title": "t", "excerpt": "x"}]
+    feeds = _FixtureRoutes(items, n_entries)
+    para = b"<p>" + b"Filler paragraph of a misbehaving page. " * 25 + b"</p>"
+    page = b"<html><body>" + para * int(page_mb * 1024 * 1024 / len(para)) + b"</body></html>"
+    routes: Dict[str, Tuple[str, bytes]] = {"/page": ("text/html; charset=utf-8", page)}
+    # 서버는 같은 프로세스라 본문을 미리 만들어 두고 압축도 끔 (측정에 섞이지 않게)
+    server = StandInServer(routes).start()
+    feeds.base_url = server.base_url
+    routes["/feed/0"] = feeds.get("/feed/0")
+    ua = "PropagandaRadar/bench"
+    max_bytes = int(max_mb * 1024 * 1024)
+
+    def measure(fn) -> Tuple[Any, float, float]:
+        # 시간은 추적 없이, 메모리는 tracemalloc 켠 두 번째 실행에서
+        out, sec = _timed(fn)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return out, sec, peak / 1e6
+
+    def whole_feed():
+        r = requests.get(f"{server.base_url}/feed/0", headers={"User-Agent": ua}, timeout=30)
+        return feedparser.parse(r.content).entries[:keep], len(r.content)
+
+    def streamed_feed():
+        info: Dict[str, Any] = {}
+        content = download_feed(f"{server.base_url}/feed/0", 30, ua, max_bytes=max_bytes, max_items=keep, info=info)
+        return parse_feed(content, keep, info["truncated"]).entries, info["bytes"]
+
+    def whole_page():
+        return len(requests.get(f"{server.base_url}/page", headers={"User-Agent": ua}, timeout=30).text)
+
+    def streamed_page():
+        return len(fetch_html(f"{server.base_url}/page", 30, ua, max_bytes=max_bytes))
+
+    try:
+        (old_entries, old_bytes), old_sec, old_mb = measure(whole_feed)
+        (new_entries, new_bytes), new_sec, new_mb = measure(streamed_feed)
+        old_page, old_page_sec, old_page_mb = measure(whole_page)
+        new_page, new_page_sec, new_page_mb = measure(streamed_page)
+    finally:
+        server.stop()
+        close_session()
+    same = [(e.get("title"), e.get("link")) for e in old_entries] == [(e.get("title"), e.get("link")) for e in new_entries]
+    return {
+        "benchmark": "feed",
+        "feed_entries": n_entries,
+        "kept": keep,
+        "same_entries": same,
+        "feed": {
+            "whole": {"sec": round(old_sec, 4), "peak_mb": round(old_mb, 2), "bytes_read": old_bytes},
+            "streamed": {"sec": round(new_sec, 4), "peak_mb": round(new_mb, 2), "bytes_read": new_bytes},
+        },
+        "page": {
+            "page_mb": page_mb,
+            "max_mb": max_mb,
+            "whole": {"sec": round(old_page_sec, 4), "peak_mb": round(old_page_mb, 2), "chars": old_page},
+            "streamed": {"sec": round(new_page_sec, 4), "peak_mb": round(new_page_mb, 2), "chars": new_page},
+        },
+    }
+
+
+def _bench_keywords(rng: random.Random, texts: List[str], n: int) -> List[Dict[str, Any]]:
+    """The real keywords (the shared "propaganda" rule set) padded with n distinct words drawn from report text."""
+    with open("sources.yaml", "r", encoding="utf-8") as f:
+        g = yaml.safe_load(f)["global"]
+    real = ((g.get("rule_sets") or {}).get("propaganda") or {}).get("keywords") or []
+    words = sorted({w.strip(".,:;\"'()").lower() for t in texts for w in t.split() if len(w) >= 5})
+    picked = rng.sample(words, min(max(0, n - len(real)), len(words)))
+    return (real + [{"term": w, "weight": rng.randint(1, 6)} for w in picked])[:max(n, 1)]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    # nearest rank: the smallest value with at least q of the values at or below it
+    xs = sorted(values)
+    if not xs:
+        return 0.0
+    return xs[min(len(xs) - 1, max(0, math.ceil(q * len(xs)) - 1))]
+
+
+def _read_run_log(path: str) -> Tuple[Dict[str, List[float]], Dict[str, Any]]:
+    spans: Dict[str, List[float]] = {}
+    summary: Dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            if rec.get("level") == "SPAN":
+                spans.setdefault(rec["stage"], []).append(float(rec["sec"]))
+            elif rec.get("level") == "SUMMARY":
+                summary = rec
+    return spans, summary
+
+
+def bench_pipeline(
+    n_sources: int,
+    n_entries: int,
+    n_keywords: int,
+    runs: int,
+    new_per_run: int,
+    policy: str,
+    workers: int,
+    latency_ms: int,
+    deadline_sec: int = 0,
+    articles_per_source: int = 0,
+    per_host: int = 0,
+    near_dup: bool = True,
+    shared_rules: bool = True,
+) -> Dict[str, Any]:
+    """
+    The full radar.run main() against a stand-in server replaying report-derived
+    feeds and pages: n_sources feeds of n_entries each, n_keywords keywords per
+    source. The first run starts from empty state and cache; every later run
+    sees new_per_run fresh entries per feed on top of known ones. deadline_sec
+    and articles_per_source set the article fetch budget; per_host > 0
+    overrides request.per_host_concurrency (every page is on one host here).
+    The fixture reuses report items across sources, so feeds carry copies of
+    the same story under different links; near_dup=False turns off
+    dedupe.near_dup. The keywords are one global rule set that every source
+    references, or with shared_rules=False a copy inline in every source.
+    """
+    items = [it for it in load_report_items() if it["excerpt"]]
+    if not items:
+        raise SystemExit("no items found under out/daily/")
+    with open("sources.yaml", "r", encoding="utf-8") as f:
+        base_cfg = yaml.safe_load(f)
+    keywords = _bench_keywords(random.Random(0), [it["excerpt"] for it in items], n_keywords)
+    context_rules = ((base_cfg["global"].get("rule_sets") or {}).get("propaganda") or {}).get("context_rules") or []
+
+    routes = _FixtureRoutes(items, n_entries)
+    server = StandInServer(routes, latency_ms=latency_ms).start()
+    routes.base_url = server.base_url
+    tmp = tempfile.mkdtemp(prefix="radar-bench-pipeline-")
+    cwd = os.getcwd()
+    results = []
+    try:
+        g = base_cfg["global"]
+        g.setdefault("request", {})["max_feed_items_per_source"] = n_entries
+        if per_host > 0:
+            g["request"]["per_host_concurrency"] = per_host
+        g["dedupe"] = dict(g["dedupe"], near_dup=dict(g["dedupe"].get("near_dup") or {}, enabled=near_dup))
+        g.setdefault("extract", {})["workers"] = workers
+        g.setdefault("cache", {})["dir"] = "out/cache/articles"
+        g["budget"] = dict(g.get("budget") or {}, run_deadline_sec=deadline_sec, articles_per_source=articles_per_source)
+        lexicon = {"keywords": keywords, "context_rules": context_rules}
+        g["rule_sets"] = {"bench": lexicon} if shared_rules else {}
+        cfg = {
+            "global": g,
+            "sources": [
+                dict(
+                    {"id": f"bench_{s}", "name": f"Bench {s}", "url": f"{server.base_url}/feed/{s}", "policy": policy},
+                    # a real copy per source: safe_dump would write one shared list as a YAML alias
+                    **({"rule_sets": ["bench"]} if shared_rules else copy.deepcopy(lexicon)),
+                )
+                for s in range(n_sources)
+            ],
+        }
+        with open(os.path.join(tmp, "sources.yaml"), "w", encoding="utf-8") as f:
+            yaml.safe_dump(cfg, f, allow_unicode=True, sort_keys=False)
+        config_bytes = os.path.getsize(os.path.join(tmp, "sources.yaml"))
+
+        os.chdir(tmp)
+        for r in range(runs):
+            if r:
+                routes.advance(new_per_run)
+            server.reset_counters()
+            out = io.StringIO()
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(out):
+                # back-to-back runs: the polling schedule would skip every source
+                run_main(["--config", "sources.yaml", "--state", "state.json", "--send-telegram", "false", "--force-all"])
+            wall = time.perf_counter() - t0
+            ok = out.getvalue().strip().splitlines()[-1]
+            n_items = int(ok.split("items=", 1)[1].split()[0])
+            log_file = ok.rsplit("(log: ", 1)[1].rstrip(")")
+            spans, _ = _read_run_log(log_file)
+            budget = {"per_source": 0, "deadline": 0, "retry_queue": 0}
+            dups = {"matched": 0, "reused_text": 0}
+            stages: List[Dict[str, Any]] = []
+            with open(log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    rec = json.loads(line)
+                    if "retry_queue" in rec:
+                        budget = {k: rec[k] for k in budget}
+                    if "pipeline" in rec:
+                        stages = rec["pipeline"]
+                    if "reused_text" in rec:
+                        dups = {k: rec[k] for k in dups}
+            shutil.rmtree("out/logs")  # log names have 1 s resolution; keep runs apart
+            policies: Dict[str, int] = {}
+            for path in glob.glob("out/items/items_*.jsonl"):
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        pu = json.loads(line)["policy_used"]
+                        policies[pu] = policies.get(pu, 0) + 1
+
+            self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            results.append({
+                "run": r,
+                "wall_sec": round(wall, 4),
+                "new_items": n_items,
+                "items_per_sec": round(n_items / wall, 1) if wall else None,
+                "feed_entries_per_sec": round(n_sources * n_entries / wall, 1) if wall else None,
+                "requests": server.counters["requests"],
+                "connections": server.counters["connections"],
+                "bytes_sent": server.counters["bytes_sent"],
+                "peak_rss_kb": {"main": self_rss, "extract_workers": child_rss},
+                "article_budget": budget,
+                "near_dups": dups,
+                "config_sec": round(sum(spans.get("config", [0.0])), 4),
+                "pipeline": stages,
+                "logged_policies": policies,
+                "state": {
+                    "bytes": os.path.getsize("state.json"),
+                    "load_sec": round(sum(spans.get("state_load", [0.0])), 4),
+                    "save_sec": round(sum(spans.get("save", [0.0])), 4),
+                },
+                "stages": {
+                    stage: {
+                        "count": len(xs),
+                        "total_sec": round(sum(xs), 4),
+                        "p50_ms": round(_percentile(xs, 0.50) * 1000, 3),
+                        "p95_ms": round(_percentile(xs, 0.95) * 1000, 3),
+                    }
+                    for stage, xs in spans.items()
+                },
+            })
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "benchmark": "pipeline",
+        "sources": n_sources,
+        "entries_per_source": n_entries,
+        "keywords": len(keywords),
+        "policy": policy,
+        "extract_workers": workers,
+        "latency_ms": latency_ms,
+        "deadline_sec": deadline_sec,
+        "articles_per_source": articles_per_source,
+        "near_dup": near_dup,
+        "shared_rules": shared_rules,
+        "config_bytes": config_bytes,
+        "new_per_run": new_per_run,
+        "cpu_count": os.cpu_count(),
+        "runs": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m radar.bench")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_http = sub.add_parser("http", help="connection reuse of the shared session vs. plain requests.get")
+    p_http.add_argument("--requests", type=int, default=200)
+    p_http.add_argument("--hosts", type=int, default=2)
+    p_http.add_argument("--pool-connections", type=int, default=16)
+    p_http.add_argument("--pool-maxsize", type=int, default=4)
+    p_http.add_argument("--compress", action="store_true", help="serve gzip/brotli encoded bodies")
+
+    p_score = sub.add_parser("score", help="compiled scorer vs. the original implementation on report text")
+    p_score.add_argument("--keywords", type=int, default=200)
+    p_score.add_argument("--rules", type=int, default=20)
+    p_score.add_argument("--rounds", type=int, default=5)
+    p_score.add_argument("--seed", type=int, default=0)
+
+    p_extract = sub.add_parser("extract", help="trafilatura throughput by process-pool size on report-derived pages")
+    p_extract.add_argument("--pages", type=int, default=300)
+    p_extract.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+
+    p_state = sub.add_parser("state", help="seen-store load/save time by backend and size")
+    p_state.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated seen-entry counts")
+    p_state.add_argument("--run-entries", type=int, default=300, help="feed entries looked up per simulated run")
+
+    p_format = sub.add_parser("state-format", help="state.json v1 vs v2 size and load time")
+    p_format.add_argument("--sizes", default="10000,100000", help="comma-separated seen-entry counts")
+
+    p_bloom = sub.add_parser("bloom", help="seen lookups: JSON vs SQLite vs SQLite behind the Bloom filter")
+    p_bloom.add_argument("--keys", type=int, default=1000000)
+    p_bloom.add_argument("--lookups", type=int, default=100000, help="new and known keys looked up each")
+    p_bloom.add_argument("--fp-rate", type=float, default=0.001)
+
+    p_feed = sub.add_parser("feed", help="whole vs. streamed, size-capped feed and page downloads")
+    p_feed.add_argument("--entries", type=int, default=5000, help="items in the served feed")
+    p_feed.add_argument("--keep", type=int, default=30, help="max_feed_items_per_source")
+    p_feed.add_argument("--page-mb", type=float, default=40.0)
+    p_feed.add_argument("--max-mb", type=float, default=3.0)
+
+    p_pipe = sub.add_parser("pipeline", help="end-to-end radar.run against recorded fixtures on a local server")
+    p_pipe.add_argument("--sources", type=int, default=20)
+    p_pipe.add_argument("--entries", type=int, default=30, help="entries per feed")
+    p_pipe.add_argument("--keywords", type=int, default=50, help="keywords per source")
+    p_pipe.add_argument("--runs", type=int, default=2, help="first run is cold, later runs see --new-per-run new entries")
+    p_pipe.add_argument("--new-per-run", type=int, default=5)
+    p_pipe.add_argument("--policy", default="LEAD_3_PARAGRAPHS", choices=["RSS_ONLY", "LEAD_3_PARAGRAPHS", "FULL_TEXT"])
+    p_pipe.add_argument("--workers", type=int, default=2, help="extract workers")
+    p_pipe.add_argument("--latency-ms", type=int, default=0, help="stand-in server delay per response")
+    p_pipe.add_argument("--deadline-sec", type=int, default=0, help="budget.run_deadline_sec")
+    p_pipe.add_argument("--articles-per-source", type=int, default=0, help="budget.articles_per_source")
+    p_pipe.add_argument("--per-host", type=int, default=0, help="request.per_host_concurrency (default: from sources.yaml)")
+    p_pipe.add_argument("--no-near-dup", action="store_true", help="dedupe.near_dup.enabled: false")
+    p_pipe.add_argument("--inline-rules", action="store_true", help="copy the keywords into every source instead of one global rule set")
+    p_pipe.add_argument("--output", default=None, help="also append the result as one JSON line to this file")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "http":
+        result = bench_http(args.requests, args.hosts, args.pool_connections, args.pool_maxsize, args.compress)
+    elif args.cmd == "score":
+        result = bench_score(args.keywords, args.rules, args.rounds, args.seed)
+    elif args.cmd == "state":
+        result = bench_state([int(x) for x in args.sizes.split(",") if x.strip()], args.run_entries)
+    elif args.cmd == "state-format":
+        result = bench_state_format([int(x) for x in args.sizes.split(",") if x.strip()])
+    elif args.cmd == "extract":
+        result = bench_extract(args.pages, [int(w) for w in args.workers.split(",") if w.strip()])
+    elif args.cmd == "bloom":
+        result = bench_bloom(args.keys, args.lookups, args.fp_rate)
+    elif args.cmd == "feed":
+        result = bench_feed(args.entries, args.keep, args.page_mb, args.max_mb)
+    elif args.cmd == "pipeline":
+        result = bench_pipeline(
+            args.sources, args.entries, args.keywords, args.runs, args.new_per_run,
+            args.policy, args.workers, args.latency_ms, args.deadline_sec, args.articles_per_source, args.per_host,
+            not args.no_near_dup, not args.inline_rules,
+        )
+        result["timestamp"] = datetime.now(timezone.utc).isoformat()
+        if args.output:
+            with open(args.output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(json.dumps(result, indent=2))
+    if result.get("mismatches"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
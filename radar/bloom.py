@@ -0,0 +1,230 @@
+from __future__ import annotations
+import base64
+import math
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from radar.state import StateStore, compact_key
+
+_MAGIC = b"RBLM"
+# magic, version, hashes, bits, keys added, keys pruned since the build,
+# size and mtime_ns of the store file as of the last update (see store_stamp)
+_HEADER = struct.Struct("<4sBB2xQQQQq")
+_VERSION = 2
+
+def store_stamp(path: str) -> Tuple[int, int]:
+    """(size, mtime_ns) of the store file, (0, 0) if it does not exist yet."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0, 0
+    return st.st_size, st.st_mtime_ns
+
+def _positions(ck: str, m: int, k: int) -> Iterator[int]:
+    # compact keys are already SHA-1 bytes: split them for double hashing
+    raw = base64.urlsafe_b64decode(ck)
+    h1 = int.from_bytes(raw[:6], "little")
+    h2 = int.from_bytes(raw[6:12], "little") | 1
+    for i in range(k):
+        yield (h1 + i * h2) % m
+
+class BloomFilter:
+    """
+    Bloom filter over compact seen keys, stored as a small header plus the bit
+    array. open() maps the file read-only, so startup cost does not grow with
+    the number of keys; add() needs a filter from create() or open(writable=True).
+    """
+
+    def __init__(self, m: int, k: int, bits: Any, count: int = 0, stale: int = 0, mm: Optional[mmap.mmap] = None,
+                 stamp: Tuple[int, int] = (0, 0)):
+        self.m = m
+        self.k = k
+        self.bits = bits
+        self.count = count
+        self.stale = stale
+        self.stamp = stamp
+        self._mm = mm
+        self._offset = _HEADER.size if mm is not None else 0
+
+    @staticmethod
+    def size_for(capacity: int, fp_rate: float) -> "tuple[int, int]":
+        """(bits, hashes) for capacity keys at the given false-positive rate."""
+        capacity = max(1, capacity)
+        fp_rate = min(max(fp_rate, 1e-9), 0.5)
+        m = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        m = (m + 7) // 8 * 8
+        k = max(1, int(round(m / capacity * math.log(2))))
+        return m, k
+
+    @classmethod
+    def create(cls, capacity: int, fp_rate: float) -> "BloomFilter":
+        m, k = cls.size_for(capacity, fp_rate)
+        return cls(m, k, bytearray(m // 8))
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> "BloomFilter":
+        with open(path, "r+b" if writable else "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        if len(mm) < _HEADER.size:
+            mm.close()
+            raise ValueError(f"not a bloom filter file: {path}")
+        magic, version, k, m, count, stale, size, mtime_ns = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != _VERSION or len(mm) != _HEADER.size + m // 8:
+            mm.close()
+            raise ValueError(f"not a bloom filter file: {path}")
+        return cls(m, k, mm, count, stale, mm, (size, mtime_ns))
+
+    def add(self, ck: str) -> None:
+        bits, off = self.bits, self._offset
+        for p in _positions(ck, self.m, self.k):
+            bits[off + (p >> 3)] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, ck: str) -> bool:
+        # hot path: _positions inlined
+        raw = base64.urlsafe_b64decode(ck)
+        h1 = int.from_bytes(raw[:6], "little")
+        h2 = int.from_bytes(raw[6:12], "little") | 1
+        bits, off, m = self.bits, self._offset, self.m
+        for i in range(self.k):
+            p = (h1 + i * h2) % m
+            if not bits[off + (p >> 3)] & (1 << (p & 7)):
+                return False
+        return True
+
+    def expected_fp_rate(self, extra: int = 0) -> float:
+        """False-positive rate once count + extra keys are in (pruned keys still set their bits)."""
+        n = max(0, self.count + extra)
+        return (1.0 - math.exp(-self.k * n / self.m)) ** self.k
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.k, self.m, self.count, self.stale, *self.stamp))
+            f.write(bytes(self.bits[self._offset:self._offset + self.m // 8]))
+        os.replace(tmp, path)
+
+    def flush_header(self) -> None:
+        if self._mm is not None:
+            _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, self.k, self.m, self.count, self.stale, *self.stamp)
+            self._mm.flush()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+class BloomFrontStore(StateStore):
+    """
+    A seen store behind a Bloom filter (<state>.bloom next to it). is_seen
+    answers "definitely new" from the mapped filter and only asks the exact
+    store on a possible hit. Keys marked during the run are added to the
+    file on save; the filter is rebuilt from the store once pruned keys pass
+    rebuild_stale of its contents or it fills past its capacity.
+
+    The header records the store file's size and mtime as of the filter's
+    last update. If the store changed behind the filter's back (state.json
+    replaced by a pull or restore, or a crash between the store's save and
+    the filter's), the filter is rebuilt on open.
+    """
+
+    def __init__(self, inner: StateStore, path: str, fp_rate: float = 0.001, capacity: int = 0,
+                 rebuild_stale: float = 0.2):
+        self.inner = inner
+        self.path = path
+        self.fp_rate = fp_rate
+        self.capacity = capacity
+        self.rebuild_stale = rebuild_stale
+        self.added: Set[str] = set()
+        self.pruned = 0
+        self.stats: Dict[str, int] = {"definitely_new": 0, "checked": 0, "false_positives": 0}
+        self.bloom: Optional[BloomFilter] = None
+        try:
+            self.bloom = BloomFilter.open(path)
+        except (FileNotFoundError, ValueError):
+            self.bloom = None
+        if self.bloom is None or self.bloom.stamp != store_stamp(inner.path) or self._needs_rebuild(0):
+            self._rebuild()
+
+    def _keys(self) -> Iterable[str]:
+        return (rec["key"] for rec in self.inner.iter_seen())
+
+    def _rebuild(self) -> None:
+        keys = list(self._keys())
+        capacity = self.capacity or max(100_000, 2 * len(keys))
+        bf = BloomFilter.create(capacity, self.fp_rate)
+        for ck in keys:
+            bf.add(ck)
+        bf.stamp = store_stamp(self.inner.path)
+        bf.save(self.path)
+        if self.bloom is not None:
+            self.bloom.close()
+        self.bloom = BloomFilter.open(self.path)
+        self.pruned = 0
+
+    def _needs_rebuild(self, extra: int) -> bool:
+        bf = self.bloom
+        if bf is None:
+            return True
+        stale = bf.stale + self.pruned
+        if stale > self.rebuild_stale * max(1, bf.count - stale):
+            return True
+        return bf.expected_fp_rate(extra) > 2 * self.fp_rate
+
+    def is_seen(self, key: str) -> bool:
+        ck = compact_key(key)
+        if ck in self.added:
+            return True
+        if ck not in self.bloom:
+            self.stats["definitely_new"] += 1
+            return False
+        self.stats["checked"] += 1
+        hit = self.inner.is_seen(key)
+        if not hit:
+            self.stats["false_positives"] += 1
+        return hit
+
+    def mark_seen(self, key: str, meta: Dict[str, Any]) -> None:
+        self.inner.mark_seen(key, meta)
+        self.added.add(compact_key(key))
+
+    def prune_seen(self, keep_days: int) -> int:
+        removed = self.inner.prune_seen(keep_days)
+        self.pruned += removed
+        return removed
+
+    def drop_titles(self) -> int:
+        return self.inner.drop_titles()
+
+    def iter_seen(self) -> Iterator[Dict[str, Any]]:
+        return self.inner.iter_seen()
+
+    def section(self, name: str) -> Dict[str, Any]:
+        return self.inner.section(name)
+
+    def save(self, path: Optional[str] = None) -> None:
+        self.inner.save(path)
+        if self._needs_rebuild(len(self.added)):
+            self._rebuild()
+        elif self.added or self.pruned:
+            self.bloom.close()
+            bf = BloomFilter.open(self.path, writable=True)
+            for ck in self.added:
+                bf.add(ck)
+            bf.stale += self.pruned
+            bf.stamp = store_stamp(self.inner.path)
+            bf.flush_header()
+            bf.close()
+            self.bloom = BloomFilter.open(self.path)
+            self.pruned = 0
+        self.added.clear()
+
+    def summary(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.stats.items())
+
+    def close(self) -> None:
+        if self.bloom is not None:
+            self.bloom.close()
+        self.inner.close()
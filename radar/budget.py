@@ -0,0 +1,73 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class DeadlineExceeded(Exception):
+    """An article fetch that would start after the run deadline."""
+
+class Deadline:
+    """Wall-clock limit for the run; at=None never expires."""
+
+    def __init__(self, at: Optional[float]):
+        self.at = at
+
+    @classmethod
+    def after(cls, started: float, seconds: int) -> "Deadline":
+        return cls(started + seconds if seconds > 0 else None)
+
+    def remaining(self) -> Optional[float]:
+        return None if self.at is None else self.at - time.monotonic()
+
+    def expired(self) -> bool:
+        left = self.remaining()
+        return left is not None and left <= 0
+
+    def check(self) -> None:
+        left = self.remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"run deadline passed {-left:.1f}s ago")
+
+    def timeout(self, timeout_sec: float) -> float:
+        """timeout_sec, shortened so a request cannot run past the deadline."""
+        left = self.remaining()
+        return timeout_sec if left is None else max(0.1, min(timeout_sec, left))
+
+def fetch_priority(ps: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Sort key of a link in the article queue: retries of earlier budget
+    misses first, then the best RSS-pass score among the entries waiting
+    on it (ties keep queue order).
+    """
+    retry = any(p.get("retry") for p in ps)
+    return (0 if retry else 1, -max((int(p["sr"].score) for p in ps), default=0))
+
+class SourceBudget:
+    """Article fetches allowed per source and run; per_source 0 = no limit. take() is thread-safe."""
+
+    def __init__(self, per_source: int):
+        self.per_source = per_source
+        self.used: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def take(self, source_id: str) -> bool:
+        if self.per_source <= 0:
+            return True
+        with self._lock:
+            n = self.used.get(source_id, 0)
+            if n >= self.per_source:
+                return False
+            self.used[source_id] = n + 1
+            return True
+
+def retry_record(p: Dict[str, Any], date_str: str, attempts: int) -> Dict[str, Any]:
+    """What the next run needs to rebuild a deferred entry without its feed."""
+    return {
+        "source_id": p["source"].id,
+        "date": date_str,
+        "title": p["title"],
+        "link": p["link"],
+        "summary": p["summary"],
+        "published": p["published"],
+        "attempts": attempts,
+    }
@@ -1,8 +1,20 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Any, Dict, List
+import glob
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
 import yaml
 
+from radar import score
+from radar.score import CompiledRules, ContextRule, Keyword, compile_rules, parse_context_rules, parse_keywords
+
+# 검증된 설정 캐시 (JSON, YAML 내용 해시가 키)
+CONFIG_CACHE_DIR = os.path.join("out", "cache", "config")
+CONFIG_CACHE_KEEP = 8
+_CODE_DIGEST: Optional[bytes] = None
+
 @dataclass
 class GlobalConfig:
     mode: str
@@ -16,6 +28,35 @@ class GlobalConfig:
     max_items_per_section: int
     include_green_in_md: bool
     include_green_in_telegram: bool
+    max_concurrency: int = 8
+    per_host_concurrency: int = 2
+    pool_connections: int = 16
+    pool_maxsize: int = 4
+    max_feed_mb: float = 5.0
+    max_html_mb: float = 3.0
+    extract_workers: int = 1
+    score_workers: int = 1
+    pipeline_queue_size: int = 64
+    cache_dir: str = "out/cache/articles"
+    cache_max_mb: int = 200
+    cache_max_age_days: int = 30
+    store_titles: bool = False
+    early_exit: bool = True
+    bloom_enabled: bool = False
+    bloom_fp_rate: float = 0.001
+    bloom_capacity: int = 0
+    near_dup_enabled: bool = True
+    near_dup_max_distance: int = 5
+    near_dup_min_tokens: int = 8
+    items_dir: str = "out/items"
+    run_deadline_sec: int = 0
+    articles_per_source: int = 0
+    retry_max_attempts: int = 3
+    schedule_enabled: bool = True
+    schedule_min_minutes: int = 60
+    schedule_max_minutes: int = 1440
+    schedule_target_new: int = 5
+    schedule_slack_minutes: int = 30
 
 @dataclass
 class SourceConfig:
@@ -23,8 +64,17 @@ class SourceConfig:
     name: str
     url: str
     policy: str
-    keywords: List[Dict[str, Any]]
-    context_rules: List[Dict[str, Any]]
+    keywords: List[Keyword]
+    context_rules: List[ContextRule]
+    rules: CompiledRules
+    rule_sets: Tuple[str, ...] = ()
+
+@dataclass
+class RuleSet:
+    """A named keyword / context-rule library under global.rule_sets."""
+    name: str
+    keywords: List[Keyword]
+    context_rules: List[ContextRule]
 
 @dataclass
 class AppConfig:
@@ -36,15 +86,155 @@ def _must(d: Dict[str, Any], k: str, ctx: str) -> Any:
         raise ValueError(f"Missing required key '{k}' in {ctx}")
     return d[k]
 
-def load_config(path: str) -> AppConfig:
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+def parse_rule_sets(raw: Any, ctx: str = "root.global.rule_sets") -> Dict[str, RuleSet]:
+    if not isinstance(raw or {}, dict):
+        raise ValueError(f"Expected a mapping in {ctx}")
+    out: Dict[str, RuleSet] = {}
+    for name, body in (raw or {}).items():
+        c = f"{ctx}.{name}"
+        if not isinstance(body or {}, dict):
+            raise ValueError(f"Expected a mapping in {c}")
+        body = body or {}
+        out[str(name)] = RuleSet(
+            name=str(name),
+            keywords=parse_keywords(body.get("keywords", []), f"{c}.keywords"),
+            context_rules=parse_context_rules(body.get("context_rules", []), f"{c}.context_rules"),
+        )
+    return out
+
+def _source_rule_sets(s: Dict[str, Any], rule_sets: Dict[str, RuleSet], ctx: str) -> Tuple[str, ...]:
+    names = s.get("rule_sets", [])
+    if isinstance(names, str):
+        names = [names]
+    if not isinstance(names, list):
+        raise ValueError(f"Expected a list in {ctx}.rule_sets")
+    for j, name in enumerate(names):
+        if str(name) not in rule_sets:
+            raise ValueError(f"Unknown rule set '{name}' in {ctx}.rule_sets[{j}]")
+    return tuple(str(n) for n in names)
+
+def merge_rules(
+    sets: List[RuleSet], keywords: List[Keyword], context_rules: List[ContextRule],
+) -> Tuple[List[Keyword], List[ContextRule]]:
+    """
+    Keywords and context rules of the sets in order, then the source's own.
+    A later keyword with the same term (case-insensitive) or rule with the
+    same name replaces the earlier one in place; weight 0 removes it.
+    """
+    kws: Dict[str, Keyword] = {}
+    for kw in [kw for rs in sets for kw in rs.keywords] + keywords:
+        kws[kw.term_l] = kw
+    rules: Dict[str, ContextRule] = {}
+    for r in [r for rs in sets for r in rs.context_rules] + context_rules:
+        rules[r.name] = r
+    return [kw for kw in kws.values() if kw.weight], [r for r in rules.values() if r.weight]
+
+def _code_digest() -> bytes:
+    # 코드가 바뀌면 캐시 구조도 바뀔 수 있으므로 모듈 소스도 키에 포함.
+    # mtime은 checkout마다 새로 찍히므로 쓰지 않고 내용만 해시
+    global _CODE_DIGEST
+    if _CODE_DIGEST is None:
+        h = hashlib.sha256()
+        for mod_path in (__file__, score.__file__):
+            with open(mod_path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        _CODE_DIGEST = h.digest()
+    return _CODE_DIGEST
 
+def _cache_key(raw: bytes) -> str:
+    return hashlib.sha256(_code_digest() + raw).hexdigest()
+
+def _to_cache(cfg: AppConfig) -> Dict[str, Any]:
+    # 검증이 끝난 값만 JSON으로; 같은 규칙 묶음을 공유하는 소스는 group 하나를 가리킴
+    groups: List[Dict[str, Any]] = []
+    group_of: Dict[int, int] = {}
+    sources = []
+    for s in cfg.sources:
+        gi = group_of.get(id(s.rules))
+        if gi is None:
+            gi = group_of[id(s.rules)] = len(groups)
+            groups.append({
+                "keywords": [[kw.term, kw.weight] for kw in s.keywords],
+                "context_rules": [[r.name, r.weight, r.match_all, list(r.patterns)] for r in s.context_rules],
+            })
+        sources.append({"id": s.id, "name": s.name, "url": s.url, "policy": s.policy,
+                        "rule_sets": list(s.rule_sets), "group": gi})
+    return {"global": asdict(cfg.global_cfg), "groups": groups, "sources": sources}
+
+def _from_cache(data: Dict[str, Any]) -> AppConfig:
+    groups = []
+    for grp in data["groups"]:
+        keywords = [Keyword(str(term), int(weight)) for term, weight in grp["keywords"]]
+        context_rules = [
+            ContextRule(str(name), int(weight), bool(match_all), tuple(str(p) for p in patterns))
+            for name, weight, match_all, patterns in grp["context_rules"]
+        ]
+        groups.append((keywords, context_rules, compile_rules(keywords, context_rules)))
+    sources = []
+    for s in data["sources"]:
+        keywords, context_rules, rules = groups[int(s["group"])]
+        sources.append(SourceConfig(
+            id=str(s["id"]), name=str(s["name"]), url=str(s["url"]), policy=str(s["policy"]),
+            keywords=keywords, context_rules=context_rules, rules=rules,
+            rule_sets=tuple(str(n) for n in s["rule_sets"]),
+        ))
+    return AppConfig(global_cfg=GlobalConfig(**data["global"]), sources=sources)
+
+def _load_cached(cache_dir: str, key: str) -> Optional[AppConfig]:
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), "r", encoding="utf-8") as f:
+            return _from_cache(json.load(f))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # 깨진 캐시는 무시하고 다시 만든다
+        return None
+
+def _save_cached(cache_dir: str, key: str, cfg: AppConfig) -> None:
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"{key}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_to_cache(cfg), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        old = sorted(glob.glob(os.path.join(cache_dir, "*.json")), key=os.path.getmtime, reverse=True)
+        for p in old[CONFIG_CACHE_KEEP:]:
+            os.remove(p)
+    except OSError:
+        pass
+
+def load_config(path: str, cache_dir: Optional[str] = CONFIG_CACHE_DIR) -> AppConfig:
+    """
+    Load and validate the YAML config with each source's rules compiled.
+    The validated config is cached under cache_dir as JSON keyed by the
+    file's hash, so an unchanged config skips YAML parsing and validation
+    and each shared rule group is compiled once; cache_dir=None always
+    parses. The cache holds plain data only (no pickle), since CI restores
+    out/cache from actions/cache.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    key = _cache_key(raw) if cache_dir else ""
+    if cache_dir:
+        cached = _load_cached(cache_dir, key)
+        if cached is not None:
+            return cached
+    cfg = parse_config(yaml.safe_load(raw.decode("utf-8")) or {})
+    if cache_dir:
+        _save_cached(cache_dir, key, cfg)
+    return cfg
+
+def parse_config(data: Dict[str, Any]) -> AppConfig:
     g = _must(data, "global", "root.global")
     thresholds = _must(g, "thresholds", "root.global.thresholds")
     req = _must(g, "request", "root.global.request")
     dedupe = _must(g, "dedupe", "root.global.dedupe")
     digest = _must(g, "digest", "root.global.digest")
+    sched = g.get("schedule") or {}
+    budget = g.get("budget") or {}
+    bloom = dedupe.get("bloom") or {}
+    near_dup = dedupe.get("near_dup") or {}
 
     global_cfg = GlobalConfig(
         mode=str(_must(g, "mode", "root.global.mode")).strip(),
@@ -58,20 +248,70 @@ def load_config(path: str) -> AppConfig:
         max_items_per_section=int(_must(digest, "max_items_per_section", "root.global.digest.max_items_per_section")),
         include_green_in_md=bool(digest.get("include_green_in_md", True)),
         include_green_in_telegram=bool(digest.get("include_green_in_telegram", False)),
+        max_concurrency=max(1, int(req.get("max_concurrency", 8))),
+        per_host_concurrency=max(1, int(req.get("per_host_concurrency", 2))),
+        pool_connections=max(1, int(req.get("pool_connections", 16))),
+        pool_maxsize=max(1, int(req.get("pool_maxsize", 4))),
+        max_feed_mb=max(0.0, float(req.get("max_feed_mb", 5))),
+        max_html_mb=max(0.0, float(req.get("max_html_mb", 3))),
+        extract_workers=max(1, int((g.get("extract") or {}).get("workers", 1))),
+        score_workers=max(1, int((g.get("pipeline") or {}).get("score_workers", 1))),
+        pipeline_queue_size=max(1, int((g.get("pipeline") or {}).get("queue_size", 64))),
+        cache_dir=str((g.get("cache") or {}).get("dir", "out/cache/articles") or "").strip(),
+        cache_max_mb=int((g.get("cache") or {}).get("max_mb", 200)),
+        cache_max_age_days=int((g.get("cache") or {}).get("max_age_days", 30)),
+        store_titles=bool(dedupe.get("store_titles", False)),
+        early_exit=bool(dedupe.get("early_exit", True)),
+        bloom_enabled=bool(bloom.get("enabled", False)),
+        bloom_fp_rate=float(bloom.get("fp_rate", 0.001)),
+        bloom_capacity=max(0, int(bloom.get("capacity", 0))),
+        near_dup_enabled=bool(near_dup.get("enabled", True)),
+        near_dup_max_distance=min(15, max(0, int(near_dup.get("max_distance", 5)))),
+        near_dup_min_tokens=max(1, int(near_dup.get("min_tokens", 8))),
+        items_dir=str((g.get("items") or {}).get("dir", "out/items") or "").strip(),
+        run_deadline_sec=max(0, int(budget.get("run_deadline_sec", 0))),
+        articles_per_source=max(0, int(budget.get("articles_per_source", 0))),
+        retry_max_attempts=max(0, int(budget.get("retry_max_attempts", 3))),
+        schedule_enabled=bool(sched.get("enabled", True)),
+        schedule_min_minutes=max(0, int(sched.get("min_minutes", 60))),
+        schedule_max_minutes=max(1, int(sched.get("max_minutes", 1440))),
+        schedule_target_new=max(1, int(sched.get("target_new", 5))),
+        schedule_slack_minutes=max(0, int(sched.get("slack_minutes", 30))),
     )
 
+    rule_sets = parse_rule_sets(g.get("rule_sets"))
+    # 같은 규칙 구성(참조한 세트 + 소스별 항목)은 한 번만 컴파일해서 공유
+    compiled: Dict[Tuple, Tuple[List[Keyword], List[ContextRule], CompiledRules]] = {}
+
     sources_raw = _must(data, "sources", "root.sources")
     sources: List[SourceConfig] = []
     for i, s in enumerate(sources_raw):
         ctx = f"root.sources[{i}]"
+        names = _source_rule_sets(s, rule_sets, ctx)
+        own_kw = parse_keywords(s.get("keywords", []), f"{ctx}.keywords")
+        own_rules = parse_context_rules(s.get("context_rules", []), f"{ctx}.context_rules")
+        sig = (
+            names,
+            tuple((kw.term, kw.weight) for kw in own_kw),
+            tuple((r.name, r.weight, r.match_all, r.patterns) for r in own_rules),
+        )
+        if sig not in compiled:
+            if names:
+                keywords, context_rules = merge_rules([rule_sets[n] for n in names], own_kw, own_rules)
+            else:
+                keywords, context_rules = own_kw, own_rules
+            compiled[sig] = (keywords, context_rules, compile_rules(keywords, context_rules))
+        keywords, context_rules, rules = compiled[sig]
         sources.append(
             SourceConfig(
                 id=str(_must(s, "id", f"{ctx}.id")).strip(),
                 name=str(_must(s, "name", f"{ctx}.name")).strip(),
                 url=str(_must(s, "url", f"{ctx}.url")).strip(),
                 policy=str(_must(s, "policy", f"{ctx}.policy")).strip(),
-                keywords=list(s.get("keywords", [])),
-                context_rules=list(s.get("context_rules", [])),
+                keywords=keywords,
+                context_rules=context_rules,
+                rules=rules,
+                rule_sets=names,
             )
         )
 
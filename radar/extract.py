@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Optional, List
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, Optional, List, Tuple
 import trafilatura
 
 def extract_text_from_html(html: str, url: str) -> Optional[str]:
@@ -19,6 +21,16 @@ def extract_text_from_html(html: str, url: str) -> Optional[str]:
     except Exception:
         return None
 
+def pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for extraction pools. The runner starts its pool from a
+    pipeline thread while other threads hold locks (logging, HTTP pools,
+    queues); a forked child inherits those locks held and can deadlock, so
+    workers come from a forkserver (spawn where that is unavailable).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
 def lead_paragraphs(text: str, n: int = 3) -> str:
     if not text:
         return ""
@@ -36,3 +48,63 @@ def lead_paragraphs(text: str, n: int = 3) -> str:
         chunks.append(" ".join(buf).strip())
     chunks = [c for c in chunks if c]
     return "\n\n".join(chunks[:n])
+
+def _extract_job(job: Tuple[str, str]) -> Tuple[str, Optional[str]]:
+    url, html = job
+    return url, extract_text_from_html(html, url)
+
+def extract_many(jobs: Iterable[Tuple[str, str]], workers: int = 1) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Extract (url, html) pairs and yield (url, text) as each one finishes.
+    With workers > 1 trafilatura runs in a process pool; jobs are submitted
+    while the input is still being produced (at most 2 per worker in flight),
+    so extraction overlaps with whatever generates the HTML. workers <= 1
+    extracts in-process, and a job whose worker dies is redone in-process.
+    """
+    if workers <= 1:
+        for url, html in jobs:
+            yield url, extract_text_from_html(html, url)
+        return
+
+    def collect(done):
+        for fut in done:
+            job = pending.pop(fut)
+            try:
+                yield fut.result()
+            except Exception:
+                yield _extract_job(job)
+
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as ex:
+        for job in jobs:
+            pending[ex.submit(_extract_job, job)] = job
+            if len(pending) >= workers * 2:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                yield from collect(done)
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            yield from collect(done)
+
+class ExtractPool:
+    """
+    extract(url, html) callable from several threads at once, for the
+    runner's extract stage: with workers > 1 each call waits on a job in a
+    shared process pool (the calling thread releases the GIL meanwhile);
+    a job whose worker dies is redone in-process, as in extract_many.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.ex = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) if workers > 1 else None
+
+    def extract(self, url: str, html: str) -> Optional[str]:
+        if self.ex is None:
+            return extract_text_from_html(html, url)
+        try:
+            return self.ex.submit(_extract_job, (url, html)).result()[1]
+        except Exception:
+            return extract_text_from_html(html, url)
+
+    def close(self) -> None:
+        if self.ex is not None:
+            self.ex.shutdown()
+            self.ex = None
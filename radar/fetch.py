@@ -1,15 +1,243 @@
 from __future__ import annotations
-import requests
+import hashlib
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import feedparser
+from requests.compat import chardet
+
+from radar.session import get_session
+
+CHUNK_BYTES = 64 * 1024
+
+# RSS <item> / Atom <entry>, with or without a namespace prefix
+_ITEM_START = re.compile(rb"<(?:[A-Za-z_][\w.-]*:)?(?:item|entry)[\s/>]", re.I)
+# item end tags, plus the openers of sections whose text is not markup
+_ITEM_SCAN = re.compile(rb"<!\[CDATA\[|<!--|</(?:[A-Za-z_][\w.-]*:)?(?:item|entry)\s*>", re.I)
+_TAG = re.compile(rb"<(/?)([A-Za-z_][\w.:-]*)[^>]*?(/?)>")
+_NOT_TAGS = re.compile(rb"<!\[CDATA\[.*?\]\]>|<!--.*?-->|<\?.*?\?>|<!DOCTYPE[^>]*>", re.S | re.I)
+
+class ItemLimit:
+    """
+    Counts item end tags over a feed body as it arrives in chunks, skipping
+    CDATA sections and comments. end is the byte offset just past the last
+    counted item; done turns true once max_items items have ended
+    (0 = no limit, never done).
+    """
+
+    def __init__(self, max_items: int = 0):
+        self.max_items = max_items
+        self.count = 0
+        self.end = 0
+        self._buf = b""
+        self._base = 0
+        self._close: Optional[bytes] = None
+
+    @property
+    def done(self) -> bool:
+        return 0 < self.max_items <= self.count
+
+    def feed(self, chunk: bytes) -> bool:
+        buf = self._buf + chunk
+        pos = 0
+        while not self.done:
+            if self._close is not None:
+                i = buf.find(self._close, pos)
+                if i < 0:
+                    pos = max(pos, len(buf) - len(self._close) + 1)
+                    break
+                pos = i + len(self._close)
+                self._close = None
+                continue
+            m = _ITEM_SCAN.search(buf, pos)
+            if m is None:
+                # 청크 경계에 걸친 태그는 다음 청크와 합쳐서 다시 본다
+                pos = max(pos, len(buf) - 32)
+                break
+            token = m.group()
+            if token.startswith(b"<!["):
+                self._close = b"]]>"
+            elif token.startswith(b"<!-"):
+                self._close = b"-->"
+            else:
+                self.count += 1
+                self.end = self._base + m.end()
+            pos = m.end()
+        self._buf = buf[pos:]
+        self._base += pos
+        return self.done
+
+def _closing_tags(header: bytes) -> bytes:
+    """End tags for the elements still open at the end of header (the part before the first item)."""
+    stack: List[bytes] = []
+    for m in _TAG.finditer(_NOT_TAGS.sub(b"", header)):
+        closing, name, self_closing = m.groups()
+        if self_closing:
+            continue
+        if not closing:
+            stack.append(name)
+        elif name in stack:
+            del stack[len(stack) - 1 - stack[::-1].index(name):]
+    return b"".join(b"</" + name + b">" for name in reversed(stack))
+
+def cut_feed(content: bytes, max_items: int = 0, truncated: bool = False) -> Tuple[bytes, int]:
+    """
+    The feed up to the end of its max_items-th item (or, for a body cut off by
+    the byte cap, its last complete item), with the open channel/feed
+    elements closed again so the parser sees a well-formed document. Returns
+    (content, items kept), content unchanged when there is nothing to cut.
+    """
+    limit = ItemLimit(max_items)
+    limit.feed(content)
+    if not limit.count or not (limit.done or truncated) or limit.end >= len(content):
+        return content, limit.count
+    first = _ITEM_START.search(content)
+    if first is None or first.start() >= limit.end:
+        return content, limit.count
+    return content[:limit.end] + _closing_tags(content[:first.start()]), limit.count
 
-def fetch_feed(url: str, timeout_sec: int, user_agent: str) -> feedparser.FeedParserDict:
+def _read_capped(r: Any, max_bytes: int, limit: Optional[ItemLimit], info: Optional[Dict[str, Any]]) -> bytes:
+    """Read a streamed response up to max_bytes (0 = no cap) or until limit is done; closes it."""
+    chunks: List[bytes] = []
+    size = 0
+    truncated = None
+    try:
+        for chunk in r.iter_content(CHUNK_BYTES):
+            if max_bytes and size + len(chunk) > max_bytes:
+                chunk = chunk[: max_bytes - size]
+                truncated = "max_bytes"
+            chunks.append(chunk)
+            size += len(chunk)
+            if truncated:
+                break
+            if limit is not None and limit.feed(chunk):
+                truncated = "max_items"
+                break
+    finally:
+        r.close()
+    if info is not None:
+        info["bytes"] = size
+        info["truncated"] = truncated
+    return b"".join(chunks)
+
+def download_feed(
+    url: str,
+    timeout_sec: int,
+    user_agent: str,
+    cache: Optional[Dict[str, Any]] = None,
+    max_bytes: int = 0,
+    max_items: int = 0,
+    info: Optional[Dict[str, Any]] = None,
+) -> Optional[bytes]:
+    """
+    Download a feed body. With a cache dict (persisted per source), send
+    If-None-Match/If-Modified-Since and return None when the server answers
+    304 or the body hash is unchanged; the dict is updated in place with the
+    new validators and cumulative hits/misses.
+
+    The body is streamed: reading stops after max_bytes, or once max_items
+    items have been received (the hash then covers just those). info, if
+    given, gets the byte count and "truncated": None, "max_bytes" or
+    "max_items"; pass the latter to parse_feed.
+    """
     headers = {"User-Agent": user_agent, "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"}
-    r = requests.get(url, headers=headers, timeout=timeout_sec)
-    r.raise_for_status()
-    return feedparser.parse(r.content)
+    if cache is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+    r = get_session().get(url, headers=headers, timeout=timeout_sec, stream=True)
+    try:
+        r.raise_for_status()
+    except Exception:
+        r.close()
+        raise
+    if cache is not None and r.status_code == 304:
+        r.close()
+        cache["hits"] = int(cache.get("hits", 0)) + 1
+        return None
+    content = _read_capped(r, max_bytes, ItemLimit(max_items) if max_items else None, info)
+    if cache is None:
+        return content
+
+    content_hash = hashlib.sha1(content).hexdigest()
+    if r.headers.get("ETag"):
+        cache["etag"] = r.headers["ETag"]
+    if r.headers.get("Last-Modified"):
+        cache["last_modified"] = r.headers["Last-Modified"]
+    if cache.get("content_hash") == content_hash:
+        cache["hits"] = int(cache.get("hits", 0)) + 1
+        return None
+    cache["content_hash"] = content_hash
+    cache["misses"] = int(cache.get("misses", 0)) + 1
+    return content
+
+def parse_feed(content: bytes, max_items: int = 0, truncated: Optional[str] = None) -> feedparser.FeedParserDict:
+    """
+    Parse a feed, handing feedparser only the first max_items items (0 = all).
+    truncated is download_feed's info["truncated"]: a body cut by the byte
+    cap is parsed up to its last complete item.
+    """
+    if max_items or truncated:
+        content, _ = cut_feed(content, max_items, truncated == "max_bytes")
+    return feedparser.parse(content)
+
+def fetch_feed(
+    url: str,
+    timeout_sec: int,
+    user_agent: str,
+    cache: Optional[Dict[str, Any]] = None,
+) -> Optional[feedparser.FeedParserDict]:
+    """download_feed + parse_feed; None when the feed is unchanged."""
+    content = download_feed(url, timeout_sec, user_agent, cache=cache)
+    return None if content is None else parse_feed(content)
 
-def fetch_html(url: str, timeout_sec: int, user_agent: str) -> str:
+def fetch_html(
+    url: str,
+    timeout_sec: int,
+    user_agent: str,
+    max_bytes: int = 0,
+    info: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Download a page, streamed and cut at max_bytes (0 = no cap); decoded like requests' Response.text."""
     headers = {"User-Agent": user_agent, "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"}
-    r = requests.get(url, headers=headers, timeout=timeout_sec)
-    r.raise_for_status()
-    return r.text
+    r = get_session().get(url, headers=headers, timeout=timeout_sec, stream=True)
+    try:
+        r.raise_for_status()
+    except Exception:
+        r.close()
+        raise
+    content = _read_capped(r, max_bytes, None, info)
+    encoding = r.encoding or (chardet.detect(content)["encoding"] if content else None)
+    try:
+        return str(content, encoding or "utf-8", errors="replace")
+    except (LookupError, TypeError):
+        return str(content, errors="replace")
+
+def _host(url: str) -> str:
+    try:
+        return urlsplit(url).netloc.lower()
+    except Exception:
+        return ""
+
+class HostSlots:
+    """Per-host concurrency limit shared by fetch threads: hold(url) waits for one of the host's slots."""
+
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, url: str) -> Iterator[None]:
+        h = _host(url)
+        with self._lock:
+            sem = self._slots.get(h)
+            if sem is None:
+                sem = self._slots[h] = threading.BoundedSemaphore(self.per_host)
+        with sem:
+            yield
+
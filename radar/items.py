@@ -0,0 +1,179 @@
+from __future__ import annotations
+import glob
+import heapq
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_DATE_RE = re.compile(r"items_(\d{4}-\d{2}-\d{2})\.jsonl$")
+
+LABEL_ORDER = {"RED": 0, "WATCH": 1, "GREEN": 2}
+
+def sort_key(item: Dict[str, Any]) -> Tuple[int, int]:
+    """Report order: RED, WATCH, GREEN, then score descending."""
+    return LABEL_ORDER.get(item["label"], 9), -int(item["score"])
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+class ItemLog:
+    """
+    Append-only per-date archive of scored items: items_<date>.jsonl, one
+    rendered item per line plus the RSS summary and the seen key, so a day
+    can be re-rendered or re-scored without the network.
+
+    Every append is one run already in report order. items_<date>.meta.json
+    records the byte range of each run, per-label counts and the top_k items
+    of each label (title/link/score), all updated from the new items alone:
+    merged() streams the whole day in report order with heapq.merge over the
+    runs, and the digest is built from the sidecar without reading the log.
+
+    The sidecar also records the log's length in bytes. Data is fsynced
+    before the sidecar is replaced (temp file + os.replace), and a sidecar
+    whose length does not match the log (a crash between the two writes)
+    is discarded and rebuilt from the log.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, date_str: str) -> str:
+        return os.path.join(self.directory, f"items_{date_str}.jsonl")
+
+    def meta_path(self, date_str: str) -> str:
+        return os.path.join(self.directory, f"items_{date_str}.meta.json")
+
+    def _load_meta(self, date_str: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.meta_path(date_str), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else None
+
+    def _log_bytes(self, date_str: str) -> int:
+        try:
+            return os.path.getsize(self.path(date_str))
+        except FileNotFoundError:
+            return 0
+
+    def meta(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """The day's sidecar, or None if there is none or it does not match the log."""
+        meta = self._load_meta(date_str)
+        if meta is None or meta.get("bytes") != self._log_bytes(date_str):
+            return None
+        return meta
+
+    def _save_meta(self, date_str: str, meta: Dict[str, Any]) -> None:
+        path = self.meta_path(date_str)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_dumps(meta))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _valid_meta(self, date_str: str, top_k: Optional[int] = None) -> Dict[str, Any]:
+        meta = self.meta(date_str)
+        if meta is None:
+            stale = self._load_meta(date_str) or {}
+            meta = self._rebuild(date_str, top_k or int(stale.get("top_k") or 8))
+        return meta
+
+    @staticmethod
+    def _add_to_meta(meta: Dict[str, Any], items: List[Dict[str, Any]], top_k: int) -> None:
+        counts = meta.setdefault("counts", {})
+        top = meta.setdefault("top", {})
+        meta["top_k"] = top_k
+        fresh: Dict[str, List[Dict[str, Any]]] = {}
+        for it in items:
+            counts[it["label"]] = counts.get(it["label"], 0) + 1
+            fresh.setdefault(it["label"], []).append({"title": it.get("title"), "link": it.get("link"), "score": it["score"]})
+        for label, xs in fresh.items():
+            # stable: on equal scores earlier runs stay first, as in merged()
+            top[label] = sorted(top.get(label, []) + xs, key=lambda x: -int(x["score"]))[:top_k]
+
+    def append(self, date_str: str, items: List[Dict[str, Any]], top_k: int = 8) -> Dict[str, Any]:
+        """Append items (one run, sorted by sort_key) and return the day's updated sidecar."""
+        os.makedirs(self.directory, exist_ok=True)
+        meta = self._valid_meta(date_str, top_k)
+        if not items:
+            return meta
+        data = ("\n".join(_dumps(it) for it in items) + "\n").encode("utf-8")
+        with open(self.path(date_str), "ab") as f:
+            offset = f.tell()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        meta.setdefault("runs", []).append([offset, len(items)])
+        meta["bytes"] = offset + len(data)
+        self._add_to_meta(meta, items, top_k)
+        self._save_meta(date_str, meta)
+        return meta
+
+    def write(self, date_str: str, items: List[Dict[str, Any]], top_k: int = 8) -> Dict[str, Any]:
+        """Replace the day's log (after a re-score) with items as a single sorted run."""
+        os.makedirs(self.directory, exist_ok=True)
+        items = sorted(items, key=sort_key)
+        path = self.path(date_str)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for it in items:
+                f.write(_dumps(it) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        meta: Dict[str, Any] = {"runs": [[0, len(items)]] if items else [], "bytes": os.path.getsize(path)}
+        self._add_to_meta(meta, items, top_k)
+        self._save_meta(date_str, meta)
+        return meta
+
+    def replace(self, date_str: str, items: List[Dict[str, Any]], top_k: int = 8) -> Optional[Dict[str, Any]]:
+        """
+        Swap logged items for these, matched on "key" (a re-scored retry), and
+        rewrite the day as one sorted run. None if there is no log for the day.
+        """
+        logged = self.read(date_str)
+        if logged is None:
+            return None
+        by_key = {it["key"]: it for it in items if it.get("key")}
+        return self.write(date_str, [by_key.get(it.get("key"), it) for it in logged], top_k)
+
+    def _rebuild(self, date_str: str, top_k: int) -> Dict[str, Any]:
+        # 사이드카가 없거나 로그와 안 맞으면(이전 형식, 중간에 죽은 실행) 한 번 정렬해서 단일 run으로 다시 씀
+        items = self.read(date_str)
+        if items is None:
+            return {"runs": [], "counts": {}, "top": {}, "top_k": top_k, "bytes": 0}
+        return self.write(date_str, items, top_k)
+
+    def read(self, date_str: str) -> Optional[List[Dict[str, Any]]]:
+        """Items logged for date_str in append order, or None if there is no log for that day."""
+        try:
+            with open(self.path(date_str), "r", encoding="utf-8") as f:
+                # 줄바꿈 없는 마지막 줄은 끝나지 못한 append
+                return [json.loads(line) for line in f if line.strip() and line.endswith("\n")]
+        except FileNotFoundError:
+            return None
+
+    def _run(self, date_str: str, offset: int, count: int) -> Iterator[Dict[str, Any]]:
+        with open(self.path(date_str), "rb") as f:
+            f.seek(offset)
+            for _ in range(count):
+                yield json.loads(f.readline())
+
+    def merged(self, date_str: str) -> Iterator[Dict[str, Any]]:
+        """The whole day in report order, streamed from the sorted runs."""
+        if not os.path.exists(self.path(date_str)):
+            return
+        meta = self._valid_meta(date_str)
+        runs = [self._run(date_str, off, n) for off, n in meta.get("runs", [])]
+        yield from heapq.merge(*runs, key=sort_key)
+
+    def dates(self) -> List[str]:
+        out = []
+        for p in glob.glob(os.path.join(self.directory, "items_*.jsonl")):
+            m = _DATE_RE.search(p)
+            if m:
+                out.append(m.group(1))
+        return sorted(out)
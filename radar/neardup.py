@@ -0,0 +1,111 @@
+from __future__ import annotations
+import hashlib
+import html
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from radar.state import compact_key
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"\w+")
+FP_BITS = 64
+# 비트별 합계를 큰 정수 하나의 32비트 칸에 모아서 더함 (특징마다 64번 도는 대신 8바이트 조회)
+_LANE = 32
+_LANE_MASK = (1 << _LANE) - 1
+_SPREAD = [sum((b >> i & 1) << (i * _LANE) for i in range(8)) for b in range(256)]
+
+def tokens(title: str, summary: str) -> List[str]:
+    """Lowercased words of title + summary, markup and entities removed."""
+    text = _TAG.sub(" ", html.unescape(f"{title}\n{summary}"))
+    return _WORD.findall(unicodedata.normalize("NFKC", text).lower())
+
+def simhash(words: List[str]) -> int:
+    """64-bit SimHash over words and word pairs, weighted by count."""
+    feats = Counter(words)
+    feats.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    acc = 0
+    for feat, w in feats.items():
+        lanes = 0
+        for j, byte in enumerate(hashlib.blake2b(feat.encode("utf-8"), digest_size=FP_BITS // 8).digest()):
+            lanes |= _SPREAD[byte] << (j * 8 * _LANE)
+        acc += w * lanes
+    # bit i is set when the features with that hash bit outweigh the rest
+    total = sum(feats.values())
+    return sum(1 << i for i in range(FP_BITS) if 2 * (acc >> (i * _LANE) & _LANE_MASK) > total)
+
+class NearDupIndex:
+    """
+    SimHash fingerprints of title + summary for the entries scored in the
+    last keep_days, kept in a state section: compact seen key -> [fp, ts,
+    source_id, report date], oldest first; title and link are looked up by
+    key in that date's item log when a match is shown. Lookups split the fingerprint into max_distance + 1
+    bands; two fingerprints within max_distance bits agree on at least one
+    band, so only entries sharing a band are compared. Entries with fewer
+    than min_tokens words are not fingerprinted.
+    """
+
+    def __init__(self, section: Dict[str, Any], max_distance: int = 5, min_tokens: int = 8):
+        self.section = section
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+        n = max_distance + 1
+        width = FP_BITS // n
+        self._bands = [(i * width, width if i < n - 1 else FP_BITS - i * width) for i in range(n)]
+        self._buckets: List[Dict[int, List[str]]] = [{} for _ in self._bands]
+        for ck, rec in section.items():
+            if len(rec) > 4:
+                section[ck] = rec[:3]  # 예전 형식: [fp, ts, source_id, title, link]
+            self._index(ck, int(rec[0]))
+
+    def _band_values(self, fp: int) -> List[int]:
+        return [fp >> shift & ((1 << width) - 1) for shift, width in self._bands]
+
+    def _index(self, ck: str, fp: int) -> None:
+        for buckets, v in zip(self._buckets, self._band_values(fp)):
+            buckets.setdefault(v, []).append(ck)
+
+    def fingerprint(self, title: str, summary: str) -> Optional[int]:
+        words = tokens(title, summary)
+        return simhash(words) if len(words) >= self.min_tokens else None
+
+    def find(self, fp: int, key: str) -> Optional[Dict[str, Any]]:
+        """The closest indexed entry within max_distance of fp (earliest on ties), other than key itself."""
+        own = compact_key(key)
+        best = None
+        for buckets, v in zip(self._buckets, self._band_values(fp)):
+            for ck in buckets.get(v, ()):
+                rec = self.section.get(ck)
+                if rec is None or ck == own:
+                    continue
+                d = (int(rec[0]) ^ fp).bit_count()
+                if d <= self.max_distance and (best is None or (d, rec[1]) < (best[0], best[2][1])):
+                    best = (d, ck, rec)
+        if best is None:
+            return None
+        d, ck, rec = best
+        return {"distance": d, "key": ck, "source_id": rec[2], "ts": rec[1], "date": rec[3] if len(rec) > 3 else None}
+
+    def add(self, key: str, fp: int, source_id: str, date_str: str) -> None:
+        ck = compact_key(key)
+        self.section.pop(ck, None)
+        self.section[ck] = [fp, int(time.time()), source_id, date_str]
+        self._index(ck, fp)
+
+    def prune(self, keep_days: int) -> int:
+        """Drop entries older than keep_days (the seen window); bucket lists are rebuilt."""
+        cutoff = int(time.time()) - keep_days * 86400
+        old = []
+        for ck, rec in self.section.items():
+            if int(rec[1]) >= cutoff:
+                break
+            old.append(ck)
+        for ck in old:
+            del self.section[ck]
+        if old:
+            self._buckets = [{} for _ in self._bands]
+            for ck, rec in self.section.items():
+                self._index(ck, int(rec[0]))
+        return len(old)
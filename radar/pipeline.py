@@ -0,0 +1,192 @@
+from __future__ import annotations
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_DONE = object()
+# 우선순위 큐에서 종료 신호는 항상 마지막
+_LAST = (float("inf"),)
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_sec: float = 0.0
+    blocked_sec: float = 0.0
+    max_queued: int = 0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def wall_sec(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return max(0.0, self.finished - self.started)
+
+    def as_dict(self) -> Dict[str, Any]:
+        wall = self.wall_sec
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "in": self.items_in,
+            "out": self.items_out,
+            "errors": self.errors,
+            "wall_sec": round(wall, 4),
+            "per_sec": round(self.items_in / wall, 1) if wall > 0 else None,
+            # 다음 단계 큐가 차서 기다린 시간은 빼고
+            "busy_pct": round(100.0 * (self.busy_sec - self.blocked_sec) / (wall * self.workers), 1) if wall > 0 else None,
+            "blocked_sec": round(self.blocked_sec, 4),
+            "max_queued": self.max_queued,
+        }
+
+class Stage:
+    """
+    One pipeline stage: `workers` threads taking items from a bounded inbox
+    and calling fn(item, emit). With priority, the inbox is a priority queue
+    and the item with the smallest priority(item) is taken first (ties in
+    arrival order); priority is evaluated once, when the item is queued.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any, Callable[..., None]], None],
+        workers: int = 1,
+        queue_size: int = 64,
+        priority: Optional[Callable[[Any], Tuple]] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.priority = priority
+        self.inbox: queue.Queue = queue.PriorityQueue(queue_size) if priority else queue.Queue(queue_size)
+        self.stats = StageStats(name, self.workers)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, item: Any) -> float:
+        """Queue item, blocking while the inbox is full; returns the seconds spent blocked."""
+        t0 = time.perf_counter()
+        if self.priority is not None:
+            self.inbox.put((self.priority(item), next(self._seq), item))
+        else:
+            self.inbox.put(item)
+        blocked = time.perf_counter() - t0
+        with self._lock:
+            self.stats.max_queued = max(self.stats.max_queued, self.inbox.qsize())
+        return blocked
+
+    def _close(self) -> None:
+        for _ in range(self.workers):
+            if self.priority is not None:
+                self.inbox.put((_LAST, next(self._seq), _DONE))
+            else:
+                self.inbox.put(_DONE)
+
+    def _get(self) -> Any:
+        got = self.inbox.get()
+        return got[2] if self.priority is not None else got
+
+class Pipeline:
+    """
+    Stages connected by their bounded inboxes. emit(x) in a stage passes x to
+    the next stage and emit(x, "name") to a later one; it blocks while the
+    target inbox is full, so a slow stage holds back the ones feeding it and
+    in-flight memory is bounded by the queue sizes. A stage is closed once
+    every worker of the stage before it has finished. Exceptions from fn are
+    counted and handed to on_error; the worker carries on.
+    """
+
+    def __init__(self, stages: List[Stage], on_error: Callable[[str, Any, BaseException], None]):
+        self.stages = stages
+        self.on_error = on_error
+        self._index = {s.name: i for i, s in enumerate(stages)}
+        self._threads: List[threading.Thread] = []
+        self._remaining = [s.workers for s in stages]
+        self._lock = threading.Lock()
+
+    def _target(self, src: int, to: Optional[str]) -> Stage:
+        j = src + 1 if to is None else self._index[to]
+        if j <= src or j >= len(self.stages):
+            raise ValueError(f"stage {self.stages[src].name!r} cannot emit to {to!r}")
+        return self.stages[j]
+
+    def _emitter(self, i: int) -> Callable[..., None]:
+        stage = self.stages[i]
+
+        def emit(item: Any, to: Optional[str] = None) -> None:
+            blocked = self._target(i, to).put(item)
+            with stage._lock:
+                stage.stats.items_out += 1
+                stage.stats.blocked_sec += blocked
+
+        return emit
+
+    def _work(self, i: int) -> None:
+        stage = self.stages[i]
+        stats = stage.stats
+        emit = self._emitter(i)
+        while True:
+            item = stage._get()
+            if item is _DONE:
+                break
+            t0 = time.perf_counter()
+            with stage._lock:
+                stats.items_in += 1
+                if stats.started is None:
+                    stats.started = t0
+            try:
+                stage.fn(item, emit)
+            except Exception as e:
+                with stage._lock:
+                    stats.errors += 1
+                self.on_error(stage.name, item, e)
+            t1 = time.perf_counter()
+            with stage._lock:
+                stats.busy_sec += t1 - t0
+                stats.finished = t1
+        with self._lock:
+            self._remaining[i] -= 1
+            last = self._remaining[i] == 0
+        if last and i + 1 < len(self.stages):
+            self.stages[i + 1]._close()
+
+    def start(self) -> "Pipeline":
+        for i, stage in enumerate(self.stages):
+            for w in range(stage.workers):
+                t = threading.Thread(target=self._work, args=(i,), name=f"radar-{stage.name}-{w}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def put(self, item: Any, to: Optional[str] = None) -> None:
+        """Feed the first stage (or, before close(), any stage by name)."""
+        self.stages[0 if to is None else self._index[to]].put(item)
+
+    def close(self) -> None:
+        """No more input; stages drain and stop in order."""
+        self.stages[0]._close()
+
+    def join(self) -> None:
+        for t in self._threads:
+            t.join()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [s.stats.as_dict() for s in self.stages]
+
+    def report(self) -> str:
+        lines = [f"{'pipeline':<14}{'workers':>8}{'in':>7}{'out':>7}{'err':>5}{'per_s':>9}{'busy%':>7}{'blocked_s':>11}{'max_q':>7}"]
+        for st in self.stats():
+            per_s = f"{st['per_sec']:.1f}" if st["per_sec"] is not None else "-"
+            busy = f"{st['busy_pct']:.1f}" if st["busy_pct"] is not None else "-"
+            lines.append(
+                f"{st['stage']:<14}{st['workers']:>8}{st['in']:>7}{st['out']:>7}{st['errors']:>5}"
+                f"{per_s:>9}{busy:>7}{st['blocked_sec']:>11.3f}{st['max_queued']:>7}"
+            )
+        return "\n".join(lines)
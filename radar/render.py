@@ -1,41 +1,142 @@
 from __future__ import annotations
+import io
+import os
+import re
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
 
-def render_daily_markdown(date_str: str, items: List[Dict], include_green: bool) -> str:
+_SECTIONS = (("RED", "🔴 RED"), ("WATCH", "🟠 WATCH"), ("GREEN", "🟢 GREEN"))
+
+def _item_lines(it: Dict) -> Iterator[str]:
+    yield f"### {it['_n']}. [{it['title']}]({it['link']})"
+    yield f"- Source: **{it['source_name']}** (`{it['source_id']}`)"
+    if it.get("published"):
+        yield f"- Published: {it['published']}"
+    dup = it.get("duplicate_of")
+    if dup:
+        yield f"- Duplicate of: [{dup['title']}]({dup['link']}) — **{dup['source_name']}** (`{dup['source_id']}`)"
+    yield f"- Policy Used: `{it.get('policy_used','RSS_ONLY')}` | Score: **{it['score']}** | Label: **{it['label']}**"
+    if it.get("matches"):
+        yield f"- Matches: {it['matches']}"
+    yield ""
+    if it.get("excerpt"):
+        yield "**Excerpt**"
+        yield ""
+        yield it["excerpt"]
+        yield ""
+    yield "---"
+    yield ""
+
+def write_daily_markdown(
+    f: TextIO,
+    date_str: str,
+    items: Iterable[Dict],
+    include_green: bool,
+    counts: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Stream the daily report to f in one pass over items, which must be
+    grouped RED, WATCH, GREEN (as main() sorts them). counts (label -> n) is
+    needed up front for the headers; without it, items is counted first.
+    """
+    if counts is None:
+        items = items if isinstance(items, (list, tuple)) else list(items)
+        counts = {}
+        for it in items:
+            counts[it["label"]] = counts.get(it["label"], 0) + 1
     now = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    red = [x for x in items if x["label"] == "RED"]
-    watch = [x for x in items if x["label"] == "WATCH"]
-    green = [x for x in items if x["label"] == "GREEN"]
-
-    def section(title: str, xs: List[Dict]) -> str:
-        lines = [f"## {title} ({len(xs)})", ""]
-        for i, it in enumerate(xs, 1):
-            lines.append(f"### {i}. [{it['title']}]({it['link']})")
-            lines.append(f"- Source: **{it['source_name']}** (`{it['source_id']}`)")
-            if it.get("published"):
-                lines.append(f"- Published: {it['published']}")
-            lines.append(f"- Policy Used: `{it.get('policy_used','RSS_ONLY')}` | Score: **{it['score']}** | Label: **{it['label']}**")
-            if it.get("matches"):
-                lines.append(f"- Matches: {it['matches']}")
-            lines.append("")
-            if it.get("excerpt"):
-                lines.append("**Excerpt**")
-                lines.append("")
-                lines.append(it["excerpt"])
-                lines.append("")
-            lines.append("---")
-            lines.append("")
-        return "\n".join(lines)
-
-    out = []
-    out.append(f"# Propaganda Radar Daily — {date_str}")
-    out.append("")
-    out.append(f"- Generated: {now}")
-    out.append(f"- New Items: {len(items)} | RED: {len(red)} | WATCH: {len(watch)} | GREEN: {len(green)}")
-    out.append("")
-    out.append(section("🔴 RED", red))
-    out.append(section("🟠 WATCH", watch))
-    if include_green:
-        out.append(section("🟢 GREEN", green))
-    return "\n".join(out)
+    red, watch, green = (counts.get(k, 0) for k, _ in _SECTIONS)
+    f.write(f"# Propaganda Radar Daily — {date_str}\n\n- Generated: {now}\n")
+    f.write(f"- New Items: {sum(counts.values())} | RED: {red} | WATCH: {watch} | GREEN: {green}\n\n")
+
+    sections = _SECTIONS if include_green else _SECTIONS[:2]
+    order = {label: i for i, (label, _) in enumerate(sections)}
+    opened = -1
+
+    def open_until(idx: int) -> None:
+        nonlocal opened, n
+        while opened < idx:
+            opened += 1
+            label, title = sections[opened]
+            f.write(f"{'' if opened == 0 else chr(10)}## {title} ({counts.get(label, 0)})\n")
+            n = 0
+
+    n = 0
+    for it in items:
+        idx = order.get(it["label"])
+        if idx is None:
+            continue
+        if idx < opened:
+            raise ValueError("items are not grouped by label (RED, WATCH, GREEN)")
+        open_until(idx)
+        n += 1
+        f.write("".join("\n" + line for line in _item_lines({**it, "_n": n})))
+    open_until(len(sections) - 1)
+
+def write_daily_file(path: str, date_str: str, items: Iterable[Dict], include_green: bool,
+                     counts: Optional[Dict[str, int]] = None) -> None:
+    """write_daily_markdown into a temp file renamed over path, so a failed run never leaves half a report."""
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            write_daily_markdown(f, date_str, items, include_green, counts)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def render_daily_markdown(date_str: str, items: List[Dict], include_green: bool) -> str:
+    order = {label: i for i, (label, _) in enumerate(_SECTIONS)}
+    buf = io.StringIO()
+    write_daily_markdown(buf, date_str, sorted(items, key=lambda x: order.get(x["label"], 9)), include_green)
+    return buf.getvalue()
+
+def parse_daily_markdown(md: str) -> List[Dict]:
+    """Recover the items of a report written by render_daily_markdown (for days without an item log)."""
+    items: List[Dict] = []
+    cur: Dict = {}
+    in_excerpt = False
+    for line in md.split("\n"):
+        if line.startswith("### ") and "](" in line:
+            head, link = line.rsplit("](", 1)
+            cur = {
+                "title": head.split(". [", 1)[-1],
+                "link": link[:-1] if link.endswith(")") else link,
+                "source_name": "",
+                "source_id": "",
+                "published": "",
+                "policy_used": "RSS_ONLY",
+                "score": 0,
+                "label": "GREEN",
+                "matches": "",
+                "excerpt": "",
+            }
+            items.append(cur)
+            in_excerpt = False
+        elif not cur:
+            continue
+        elif in_excerpt:
+            if line == "---":
+                in_excerpt = False
+            elif line:
+                cur["excerpt"] = (cur["excerpt"] + "\n\n" + line) if cur["excerpt"] else line
+        elif line.startswith("- Source: **") and "** (`" in line:
+            name, sid = line[len("- Source: **"):].rsplit("** (`", 1)
+            cur["source_name"] = name
+            cur["source_id"] = sid.rstrip("`)")
+        elif line.startswith("- Published: "):
+            cur["published"] = line[len("- Published: "):]
+        elif line.startswith("- Duplicate of: ["):
+            m = re.match(r"- Duplicate of: \[(.*)\]\((.*)\) — \*\*(.*)\*\* \(`([^`]*)`\)$", line)
+            if m:
+                cur["duplicate_of"] = dict(zip(("title", "link", "source_name", "source_id"), m.groups()))
+        elif line.startswith("- Policy Used: `"):
+            m = re.match(r"- Policy Used: `([^`]*)` \| Score: \*\*(-?\d+)\*\* \| Label: \*\*(\w+)\*\*", line)
+            if m:
+                cur["policy_used"], cur["score"], cur["label"] = m.group(1), int(m.group(2)), m.group(3)
+        elif line.startswith("- Matches: "):
+            cur["matches"] = line[len("- Matches: "):]
+        elif line == "**Excerpt**":
+            in_excerpt = True
+    return items
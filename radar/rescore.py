@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from radar.config import AppConfig, load_config
+from radar.extract import lead_paragraphs, pool_context
+from radar.items import ItemLog, sort_key
+from radar.render import parse_daily_markdown, write_daily_file
+from radar.run import compact_matches, policy_outcome
+from radar.textcache import ArticleCache
+
+# 워커 프로세스마다 한 번만 로드
+_cfg: Optional[AppConfig] = None
+_cache: Optional[ArticleCache] = None
+
+def _init(config_path: str) -> None:
+    global _cfg, _cache
+    _cfg = load_config(config_path)
+    _cache = None
+    g = _cfg.global_cfg
+    if g.cache_dir and os.path.isdir(g.cache_dir):
+        _cache = ArticleCache(g.cache_dir, g.cache_max_mb * 1024 * 1024, g.cache_max_age_days)
+
+def _load_day(date_str: str, items_dir: str, daily_dir: str) -> Tuple[str, List[Dict[str, Any]]]:
+    logged = ItemLog(items_dir).read(date_str) if items_dir else None
+    if logged is not None:
+        return "log", logged
+    with open(os.path.join(daily_dir, f"daily_{date_str}.md"), "r", encoding="utf-8") as f:
+        return "report", parse_daily_markdown(f.read())
+
+def rescore_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Re-score stored items against the loaded config, offline. The body comes
+    from the article cache, else from the recorded excerpt for items that were
+    scored with one; report-only items without a logged summary use the
+    RSS_ONLY excerpt as their summary. Items of unknown sources are kept as is.
+    Items of all sources sharing one compiled rule set are scored as one batch.
+    """
+    g = _cfg.global_cfg
+    sources = {s.id: s for s in _cfg.sources}
+    out: List[Dict[str, Any]] = list(items)
+    by_rules: Dict[int, List[Tuple[int, str, str, Optional[str], str]]] = {}
+    for i, it in enumerate(items):
+        s = sources.get(it.get("source_id"))
+        if s is None:
+            continue
+        policy = (s.policy or "RSS_ONLY").strip().upper()
+        if "summary" in it:
+            summary = it["summary"] or ""
+        else:
+            summary = it.get("excerpt", "") if it.get("policy_used") == "RSS_ONLY" else ""
+        text: Optional[str] = None
+        if policy in ("LEAD_3_PARAGRAPHS", "FULL_TEXT"):
+            if _cache is not None and it.get("link"):
+                _, text = _cache.get(it["link"])
+            if not text and it.get("policy_used") in ("LEAD_3_PARAGRAPHS", "FULL_TEXT"):
+                text = it.get("excerpt") or None
+        lead = lead_paragraphs(text, 3) if text else ""
+        by_rules.setdefault(id(s.rules), []).append((i, summary, lead, text, policy))
+
+    for rows in by_rules.values():
+        rules = sources[items[rows[0][0]]["source_id"]].rules
+        docs = []
+        for i, summary, lead, _, _ in rows:
+            title = items[i].get("title") or ""
+            docs.append(("" if title == "(no title)" else title, summary, lead))
+        batch = rules.score_batch(docs, g.mode, g.watch_threshold, g.red_threshold)
+        for j, (i, summary, lead, text, policy) in enumerate(rows):
+            s = sources[items[i]["source_id"]]
+            label = batch.labels[j]
+            policy_used, excerpt = policy_outcome(policy, label, text, lead, summary, g.full_text_scope)
+            new = dict(items[i])
+            new.update({
+                "source_name": s.name,
+                "score": batch.scores[j],
+                "label": label,
+                "policy_used": policy_used,
+                "matches": compact_matches(*batch.matches(j)),
+                "excerpt": (excerpt or "").strip(),
+            })
+            out[i] = new
+    return out
+
+def _rescore_day(job: Tuple[str, str, str]) -> Tuple[str, str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    date_str, items_dir, daily_dir = job
+    origin, items = _load_day(date_str, items_dir, daily_dir)
+    return date_str, origin, items, rescore_items(items)
+
+def _days(items_dir: str, daily_dir: str, start: Optional[str], end: Optional[str]) -> List[str]:
+    days = set(ItemLog(items_dir).dates()) if items_dir else set()
+    if os.path.isdir(daily_dir):
+        for name in os.listdir(daily_dir):
+            if name.startswith("daily_") and name.endswith(".md"):
+                days.add(name[len("daily_"):-len(".md")])
+    return sorted(d for d in days if (not start or d >= start) and (not end or d <= end))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m radar.rescore")
+    parser.add_argument("--config", default="sources.yaml")
+    parser.add_argument("--from", dest="start", default=None, help="first date YYYY-MM-DD (default: earliest)")
+    parser.add_argument("--to", dest="end", default=None, help="last date YYYY-MM-DD (default: latest)")
+    parser.add_argument("--daily-dir", default="out/daily")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true", help="print label changes only; leave reports and item logs alone")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    cfg = load_config(args.config)
+    g = cfg.global_cfg
+    days = _days(g.items_dir, args.daily_dir, args.start, args.end)
+    jobs = [(d, g.items_dir, args.daily_dir) for d in days]
+
+    if args.workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=pool_context(), initializer=_init, initargs=(args.config,),
+        ) as ex:
+            results = list(ex.map(_rescore_day, jobs))
+    else:
+        _init(args.config)
+        results = [_rescore_day(j) for j in jobs]
+
+    n_items = label_changes = score_changes = from_reports = 0
+    for date_str, origin, old, new in results:
+        n_items += len(new)
+        from_reports += origin == "report"
+        for a, b in zip(old, new):
+            if a.get("label") != b["label"]:
+                label_changes += 1
+                print(f"{date_str} {b.get('source_id')}: {a.get('label')} -> {b['label']} "
+                      f"(score {a.get('score')} -> {b['score']}) {b.get('title')}")
+            elif a.get("score") != b["score"]:
+                score_changes += 1
+        if args.dry_run:
+            continue
+        new.sort(key=sort_key)
+        if g.items_dir:
+            ItemLog(g.items_dir).write(date_str, new, top_k=g.max_items_per_section)
+        write_daily_file(os.path.join(args.daily_dir, f"daily_{date_str}.md"), date_str, new, g.include_green_in_md)
+
+    print(
+        f"OK: days={len(results)} items={n_items} label_changes={label_changes} "
+        f"score_only_changes={score_changes} (from reports without item log: {from_reports}) "
+        f"in {time.perf_counter() - t0:.2f}s{' [dry run]' if args.dry_run else ''}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,37 @@
 from __future__ import annotations
 
 import argparse
+import atexit
 import hashlib
+import json
 import os
+import threading
+import time
 import traceback
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from radar.config import load_config
 from radar.state import (
-    load_state, save_state, is_seen, mark_seen, prune_seen,
-    get_last_sent_date, set_last_sent_date
+    load_state, save_state, is_seen, mark_seen, prune_seen, drop_titles, compact_key,
+    get_last_sent_date, set_last_sent_date, get_feed_cache, get_schedule, get_hwm, get_retry, get_neardup
 )
-from radar.fetch import fetch_feed, fetch_html
-from radar.extract import extract_text_from_html, lead_paragraphs
-from radar.score import score_item, classify
-from radar.render import render_daily_markdown
-from radar.telegram import build_digest_message, send_telegram_message
+from radar.bloom import BloomFrontStore
+from radar.budget import Deadline, DeadlineExceeded, SourceBudget, fetch_priority, retry_record
+from radar.fetch import HostSlots, download_feed, parse_feed, fetch_html
+from radar.session import configure_http, close_session
+from radar.textcache import ArticleCache, html_hash
+from radar.extract import ExtractPool, lead_paragraphs
+from radar.neardup import NearDupIndex
+from radar.pipeline import Pipeline, Stage
+from radar.score import classify
+from radar.render import write_daily_file
+from radar.items import ItemLog, sort_key
+from radar.schedule import (
+    entry_timestamp, is_due, update_schedule, is_newest_first, hwm_usable, hwm_reached, update_hwm
+)
+from radar.telegram import build_digest_message, build_digest_from_summary, send_telegram_message
 
 
 def ensure_dirs() -> None:
@@ -26,28 +41,94 @@ def ensure_dirs() -> None:
 
 def log_path() -> str:
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    return f"out/logs/run_{ts}.log"
+    return f"out/logs/run_{ts}.jsonl"
 
 
 class Logger:
-    def __init__(self, path: str):
-        self.path = path
+    """
+    Run log as JSON lines, buffered in memory and written with one open per
+    flush: on error(), when the buffer is full, and at close()/interpreter
+    exit. span(stage, **fields) times a block and records it both as a
+    "SPAN" line and in the per-stage totals that summary() tabulates.
+    """
 
-    def _write(self, level: str, msg: str):
-        line = f"[{datetime.now(timezone.utc).isoformat()}] {level}: {msg}\n"
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(line)
+    BUFFER_LINES = 500
 
-    def info(self, msg: str): self._write("INFO", msg)
-    def warn(self, msg: str): self._write("WARN", msg)
-    def error(self, msg: str): self._write("ERROR", msg)
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.perf_counter()
+        self._buf: List[str] = []
+        self._lock = threading.Lock()
+        # stage -> [count, total_sec, max_sec]
+        self.stages: Dict[str, List[float]] = {}
+        atexit.register(self.flush)
+
+    def _write(self, level: str, msg: str, **fields: Any) -> None:
+        rec = {"ts": datetime.now(timezone.utc).isoformat(), "level": level, "msg": msg}
+        rec.update(fields)
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            self._buf.append(line)
+            full = len(self._buf) >= self.BUFFER_LINES
+        if full or level == "ERROR":
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buf = self._buf, []
+        if lines:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def info(self, msg: str, **fields: Any): self._write("INFO", msg, **fields)
+    def warn(self, msg: str, **fields: Any): self._write("WARN", msg, **fields)
+    def error(self, msg: str, **fields: Any): self._write("ERROR", msg, **fields)
+
+    @contextmanager
+    def span(self, stage: str, **fields: Any) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            sec = time.perf_counter() - t0
+            with self._lock:
+                st = self.stages.setdefault(stage, [0, 0.0, 0.0])
+                st[0] += 1
+                st[1] += sec
+                st[2] = max(st[2], sec)
+            self._write("SPAN", stage, stage=stage, sec=round(sec, 6), **fields)
+
+    def summary(self) -> str:
+        """
+        Per-stage table (count, total, max, share of wall time); also logged as
+        a SUMMARY line. Stages run on worker threads (fetch, article_fetch) sum
+        across threads, so their share can exceed 100%.
+        """
+        wall = time.perf_counter() - self.started
+        with self._lock:
+            stages = {k: list(v) for k, v in self.stages.items()}
+        self._write(
+            "SUMMARY", "stage timings", wall_sec=round(wall, 6),
+            stages={k: {"count": int(c), "total_sec": round(t, 6), "max_sec": round(m, 6)} for k, (c, t, m) in stages.items()},
+        )
+        lines = [f"{'stage':<14}{'count':>7}{'total_s':>10}{'max_s':>9}{'wall%':>7}"]
+        for k, (c, t, m) in stages.items():
+            pct = 100.0 * t / wall if wall > 0 else 0.0
+            lines.append(f"{k:<14}{int(c):>7}{t:>10.3f}{m:>9.3f}{pct:>7.1f}")
+        lines.append(f"{'wall':<14}{'':>7}{wall:>10.3f}")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+def entry_ident(entry: Any) -> str:
+    return entry.get("id") or entry.get("link") or entry.get("title") or ""
 
 
 def stable_key(source_id: str, entry: Any) -> str:
-    guid = entry.get("id") or ""
-    link = entry.get("link") or ""
-    title = entry.get("title") or ""
-    base = f"{source_id}::{guid or link or title}".strip()
+    base = f"{source_id}::{entry_ident(entry)}".strip()
     return hashlib.sha1(base.encode("utf-8")).hexdigest()
 
 
@@ -73,21 +154,54 @@ def compact_matches(matched_keywords, matched_rules) -> str:
     return " | ".join(parts)
 
 
-def main():
+def policy_outcome(
+    policy: str,
+    label: str,
+    text: Optional[str],
+    lead: str,
+    summary: str,
+    full_text_scope: str,
+) -> Tuple[str, str]:
+    """
+    (policy_used, excerpt) for an item scored on title + summary + lead.
+    FULL_TEXT only keeps the whole text when full_text_scope is ALL or the
+    item came out RED (기본 안전장치); otherwise it falls back to the lead.
+    """
+    if not text or policy not in ("LEAD_3_PARAGRAPHS", "FULL_TEXT"):
+        return "RSS_ONLY", summary[:1200] if summary else ""
+    if policy == "FULL_TEXT":
+        scope = (full_text_scope or "RED").strip().upper()
+        if scope == "ALL" or label == "RED":
+            return "FULL_TEXT", text[:2500]
+    return "LEAD_3_PARAGRAPHS", lead if lead else (summary[:1200] if summary else "")
+
+
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", default="sources.yaml")
     parser.add_argument("--state", default="state.json")
     parser.add_argument("--date", default=None, help="YYYY-MM-DD (default: UTC today)")
     parser.add_argument("--send-telegram", default=None, help="true/false; overrides env SEND_TELEGRAM")
-    args = parser.parse_args()
+    parser.add_argument("--force-all", action="store_true", help="fetch every source, ignoring the polling schedule")
+    args = parser.parse_args(argv)
 
+    run_started = time.monotonic()
     ensure_dirs()
     lp = log_path()
     log = Logger(lp)
     log.info("Starting run")
 
-    cfg = load_config(args.config)
-    state = load_state(args.state)
+    with log.span("config"):
+        cfg = load_config(args.config)
+    deadline = Deadline.after(run_started, cfg.global_cfg.run_deadline_sec)
+    configure_http(cfg.global_cfg.pool_connections, cfg.global_cfg.pool_maxsize)
+    with log.span("state_load"):
+        state = load_state(args.state)
+        if cfg.global_cfg.bloom_enabled:
+            state = BloomFrontStore(
+                state, f"{args.state}.bloom",
+                fp_rate=cfg.global_cfg.bloom_fp_rate, capacity=cfg.global_cfg.bloom_capacity,
+            )
 
     date_str = args.date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
@@ -97,144 +211,584 @@ def main():
     send_telegram = send_env in ("1", "true", "yes", "y")
 
     new_items: List[Dict[str, Any]] = []
+    # 이전 실행에서 예산 초과로 RSS_ONLY 처리된 항목의 재시도 결과 (원래 날짜의 item log를 갱신)
+    retried_items: List[Dict[str, Any]] = []
 
     # prune seen
     try:
-        removed = prune_seen(state, cfg.global_cfg.keep_days)
-        log.info(f"Pruned seen entries: {removed}")
+        with log.span("prune"):
+            removed = prune_seen(state, cfg.global_cfg.keep_days)
+        log.info(f"Pruned seen entries: {removed}", removed=removed)
     except Exception as e:
         log.error(f"Failed prune_seen: {e}")
-
-    def try_fetch_and_extract(link: str) -> Optional[str]:
-        if not link:
-            return None
+    if not cfg.global_cfg.store_titles:
+        # 예전 실행이 남긴 title/link도 비워서 state.json을 바로 줄임
         try:
-            html = fetch_html(link, cfg.global_cfg.timeout_sec, cfg.global_cfg.user_agent)
-            return extract_text_from_html(html, link)
-        except Exception as ex:
-            log.warn(f"HTML extract failed: {ex}")
+            dropped = drop_titles(state)
+            if dropped:
+                log.info(f"Dropped stored titles from {dropped} seen entries (store_titles: false)", dropped=dropped)
+        except Exception as e:
+            log.error(f"Failed drop_titles: {e}")
+
+    # 근사 중복 색인: seen과 같은 keep_days 창
+    neardup: Optional[NearDupIndex] = None
+    if cfg.global_cfg.near_dup_enabled:
+        with log.span("neardup_load"):
+            neardup = NearDupIndex(
+                get_neardup(state), cfg.global_cfg.near_dup_max_distance, cfg.global_cfg.near_dup_min_tokens,
+            )
+            neardup.prune(cfg.global_cfg.keep_days)
+    near_dups = {"matched": 0, "reused_text": 0}
+    # 색인에는 제목·링크가 없음: 이번 실행분은 메모리에서, 지난 실행분은 기록된 리포트 날짜의 item log에서 찾음
+    # (entries 단계는 워커 하나라 잠금 없이 사용)
+    neardup_origins: Dict[str, Tuple[str, str]] = {}
+    logged_origins: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+    def dup_origin(dup: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        got = neardup_origins.get(dup["key"])
+        if got is None and cfg.global_cfg.items_dir:
+            # 날짜 없는 예전 기록은 지문을 남긴 시각의 UTC 날짜로
+            d = dup.get("date") or datetime.fromtimestamp(int(dup["ts"]), timezone.utc).strftime("%Y-%m-%d")
+            by_key = logged_origins.get(d)
+            if by_key is None:
+                try:
+                    logged = ItemLog(cfg.global_cfg.items_dir).read(d) or []
+                except Exception as e:
+                    log.warn(f"Item log unreadable for near-duplicate lookup ({d}): {e}")
+                    logged = []
+                by_key = logged_origins[d] = {
+                    compact_key(it["key"]): (it.get("title") or "", it.get("link") or "") for it in logged if it.get("key")
+                }
+            got = by_key.get(dup["key"])
+        if got is None:
             return None
-
+        return dict(dup, title=got[0], link=got[1])
+
+    sources_by_id = {s.id: s for s in cfg.sources}
+    feed_caches = {s.id: get_feed_cache(state, s.id) for s in cfg.sources}
+    cache_hits = 0
+    cache_misses = 0
+
+    feed_info: Dict[str, Dict[str, Any]] = {s.id: {} for s in cfg.sources}
+
+    def fetch_source_feed(s):
+        with log.span("fetch", source=s.id):
+            return download_feed(
+                s.url, cfg.global_cfg.timeout_sec, cfg.global_cfg.user_agent, cache=feed_caches[s.id],
+                max_bytes=int(cfg.global_cfg.max_feed_mb * 1024 * 1024),
+                max_items=cfg.global_cfg.max_feed_items_per_source,
+                info=feed_info[s.id],
+            )
+
+    def make_item(p: Dict[str, Any], text: Optional[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # 본문(text)이 있으면 정책에 따라 재스코어 후 (item, seen meta)
+        s = p["source"]
+        rules = p["rules"]
+        summary = p["summary"]
+        sr = p["sr"]
+        label = p["label"]
+        lead = ""
+        if text and p["policy"] in ("LEAD_3_PARAGRAPHS", "FULL_TEXT"):
+            lead = lead_paragraphs(text, 3)
+            with log.span("score", source=s.id):
+                sr = rules.finalize(rules.extend(p["partial"], lead), cfg.global_cfg.mode)
+            label = classify(sr.score, cfg.global_cfg.watch_threshold, cfg.global_cfg.red_threshold)
+        policy_used, excerpt = policy_outcome(p["policy"], label, text, lead, summary, cfg.global_cfg.full_text_scope)
+
+        item_date = p.get("date") or date_str
+        item = {
+            "date": item_date,
+            "source_id": s.id,
+            "source_name": s.name,
+            "title": p["title"] if p["title"] else "(no title)",
+            "link": p["link"] if p["link"] else "",
+            "published": p["published"],
+            "score": sr.score,
+            "label": label,
+            "policy_used": policy_used,
+            "matches": compact_matches(sr.matched_keywords, sr.matched_rules),
+            "excerpt": (excerpt or "").strip(),
+            "summary": summary,
+            "key": p["key"],
+        }
+        dup = p.get("duplicate_of")
+        if dup:
+            orig = sources_by_id.get(dup["source_id"])
+            item["duplicate_of"] = {
+                "source_id": dup["source_id"],
+                "source_name": orig.name if orig is not None else dup["source_id"],
+                "title": dup["title"],
+                "link": dup["link"],
+            }
+
+        meta = {
+            "date": item_date,
+            "source_id": s.id,
+            "label": item["label"],
+            "score": item["score"],
+        }
+        if cfg.global_cfg.store_titles:
+            meta["title"] = item["title"][:200]
+            meta["link"] = item["link"][:500]
+        return item, meta
+
+    # 폴링 스케줄: next_due가 지나지 않은 소스는 이번 실행에서 건너뜀
+    g = cfg.global_cfg
+    now_ts = int(time.time())
+    schedules = {s.id: get_schedule(state, s.id) for s in cfg.sources}
+    due_sources = []
     for s in cfg.sources:
-        log.info(f"Fetching feed: {s.id} {s.url}")
+        sched = schedules[s.id]
+        if args.force_all or not g.schedule_enabled or is_due(sched, now_ts, g.schedule_slack_minutes * 60):
+            due_sources.append(s)
+        else:
+            nd = datetime.fromtimestamp(int(sched["next_due"]), timezone.utc).isoformat()
+            log.info(f"Schedule: skip {s.id} until {nd} (interval={int(sched.get('interval', 0)) // 60}m)",
+                     source=s.id, next_due=sched["next_due"])
+    log.info(
+        f"Schedule: {len(due_sources)} due, {len(cfg.sources) - len(due_sources)} skipped"
+        f"{' (--force-all)' if args.force_all else ''}"
+    )
+
+    def reschedule(s, published: List[int], new_entries: Optional[int]) -> None:
+        if not g.schedule_enabled:
+            return
+        sched = schedules[s.id]
+        reason = update_schedule(
+            sched, now_ts, published, new_entries,
+            min_sec=g.schedule_min_minutes * 60,
+            max_sec=g.schedule_max_minutes * 60,
+            target_new=g.schedule_target_new,
+            window=g.max_feed_items_per_source,
+        )
+        log.info(f"Schedule: {s.id} next in {sched['interval'] // 60}m ({reason}, new={new_entries})",
+                 source=s.id, interval=sched["interval"], next_due=sched["next_due"])
+
+    # 본문 캐시: 파이프라인 여러 단계가 같이 쓰므로 cache_lock 아래에서만 접근
+    article_cache: Optional[ArticleCache] = None
+    if cfg.global_cfg.cache_dir:
         try:
-            feed = fetch_feed(s.url, cfg.global_cfg.timeout_sec, cfg.global_cfg.user_agent)
+            article_cache = ArticleCache(
+                cfg.global_cfg.cache_dir,
+                max_bytes=cfg.global_cfg.cache_max_mb * 1024 * 1024,
+                max_age_days=cfg.global_cfg.cache_max_age_days,
+            )
         except Exception as e:
-            log.error(f"Feed fetch failed for {s.id}: {e}")
-            continue
+            log.error(f"Article cache unavailable: {e}")
+            article_cache = None
+
+    # 상태 저장소는 entries/sink 단계가 state_lock을 잡고 한 번에 하나씩 사용
+    state_lock = threading.Lock()
+    cache_lock = threading.Lock()
+    jobs_lock = threading.Lock()
+    # 본문이 필요한 엔트리: link -> pending 목록 (같은 link는 한 번만 받음)
+    article_jobs: Dict[str, List[Dict[str, Any]]] = {}
+    queued_keys = set()
+    retry = get_retry(state)
+    retry_enabled = bool(g.items_dir) and g.retry_max_attempts > 0
+    deferred = {"per_source": 0, "deadline": 0}
+    source_budget = SourceBudget(g.articles_per_source)
+    host_slots = HostSlots(g.per_host_concurrency)
+    extractor = ExtractPool(g.extract_workers)
+    # 소스별 high-water mark 갱신 대기: sink가 이번 스캔의 엔트리를 모두 기록한 뒤에만 옮김
+    hwm_runs: Dict[str, Dict[str, Any]] = {}
+
+    def settle_hwm(source_id: str) -> None:
+        # state_lock 아래에서 호출
+        run = hwm_runs.get(source_id)
+        if run is None or run["scanning"] or run["left"]:
+            return
+        del hwm_runs[source_id]
+        if run["failed"]:
+            return  # 실패한 엔트리를 다음 실행에서 다시 보도록 이전 mark 유지
+        update_hwm(run["hwm"], *run["top"])
+
+    def queue_article(p: Dict[str, Any], emit, reuse: Optional[str] = None) -> None:
+        # reuse: 근사 중복 원본의 link. 그 본문이 받는 중이거나 캐시에 있으면 따로 받지 않음
+        if reuse:
+            with jobs_lock:
+                pending = article_jobs.get(reuse)
+                if pending is not None:
+                    pending.append(p)
+                    near_dups["reused_text"] += 1
+                    return
+            if article_cache is not None:
+                with cache_lock:
+                    found, text = article_cache.get(reuse)
+                if found and text:
+                    near_dups["reused_text"] += 1
+                    emit((reuse, text, "ok", [p]), "score")
+                    return
+        link = p["link"]
+        with jobs_lock:
+            pending = article_jobs.get(link)
+            article_jobs.setdefault(link, []).append(p)
+        if pending is not None:
+            return
+        if article_cache is not None:
+            with cache_lock:
+                found, text = article_cache.get(link)
+            if found:
+                emit((link, text, "ok", None), "score")
+                return
+        emit(link, "article")
+
+    def article_priority(link: str):
+        with jobs_lock:
+            return fetch_priority(article_jobs.get(link) or [])
+
+    # 1) 피드 다운로드 (스레드, 호스트별 동시성 제한)
+    def stage_feed(s, emit) -> None:
+        try:
+            with host_slots.hold(s.url):
+                content = fetch_source_feed(s)
+        except Exception as e:
+            emit((s, None, e))
+            return
+        emit((s, content, None))
+
+    # 2) 엔트리 필터: 파싱, high-water mark, seen 확인, RSS 기반 1차 스코어
+    def stage_entries(msg, emit) -> None:
+        nonlocal cache_hits, cache_misses
+        s, content, err = msg
+        if err is not None:
+            log.error(f"Feed fetch failed for {s.id}: {err}", source=s.id)
+            return
+        fc = feed_caches[s.id]
+        if content is None:
+            cache_hits += 1
+            log.info(f"Feed unchanged, skipped: {s.id} (cache hits={fc.get('hits', 0)}, misses={fc.get('misses', 0)})", source=s.id)
+            reschedule(s, [], None)
+            return
+        cache_misses += 1
+        log.info(f"Fetched feed: {s.id} {s.url} (cache hits={fc.get('hits', 0)}, misses={fc.get('misses', 0)})", source=s.id, bytes=len(content))
+        truncated = feed_info[s.id].get("truncated")
+        if truncated == "max_bytes":
+            log.warn(f"Feed cut at {cfg.global_cfg.max_feed_mb:g} MB, parsing complete items only: {s.id}", source=s.id, bytes=len(content))
+        elif truncated == "max_items":
+            log.info(f"Feed read stopped after {cfg.global_cfg.max_feed_items_per_source} items: {s.id}", source=s.id, bytes=len(content))
+        try:
+            with log.span("parse", source=s.id):
+                feed = parse_feed(content, cfg.global_cfg.max_feed_items_per_source, truncated)
+        except Exception as e:
+            log.error(f"Feed parse failed for {s.id}: {e}", source=s.id)
+            return
+
+        rules = s.rules
 
         entries = feed.entries[: cfg.global_cfg.max_feed_items_per_source]
-        for entry in entries:
+        entry_ts = [entry_timestamp(e) for e in entries]
+        published_ts = [ts for ts in entry_ts if ts is not None]
+        # 최신순이 확인된 피드는 지난번 최상단 엔트리(high-water mark)에서 멈춤
+        newest_first = is_newest_first(entry_ts)
+        hwm = get_hwm(state, s.id)
+        use_hwm = g.early_exit and hwm_usable(hwm, newest_first)
+        n_new = 0
+        failed = False
+        run = {"hwm": hwm, "left": 0, "failed": False, "scanning": True,
+               "top": (entry_ident(entries[0]), entry_ts[0], newest_first) if entries else None}
+        if entries:
+            with state_lock:
+                hwm_runs[s.id] = run
+        for i, entry in enumerate(entries):
             try:
                 key = stable_key(s.id, entry)
-                if is_seen(state, key):
+                with state_lock:
+                    seen = is_seen(state, key)
+                if use_hwm and hwm_reached(hwm, entry_ident(entry), entry_ts[i], seen):
+                    log.info(f"High-water mark: {s.id} stopped at entry {i}, skipped {len(entries) - i} known entries",
+                             source=s.id, scanned=i, skipped=len(entries) - i)
+                    break
+                if seen or key in queued_keys:
                     continue
+                n_new += 1
 
                 title = (entry.get("title") or "").strip()
                 link = (entry.get("link") or "").strip()
                 summary = (entry.get("summary") or entry.get("description") or "").strip()
-                published = get_entry_published(entry)
-
-                # 1) RSS 기반 1차 스코어
-                sr = score_item(
-                    title=title,
-                    summary=summary,
-                    body="",
-                    keywords=s.keywords,
-                    context_rules=s.context_rules,
-                    mode=cfg.global_cfg.mode,
-                )
-                label = classify(sr.score, cfg.global_cfg.watch_threshold, cfg.global_cfg.red_threshold)
-
-                policy = (s.policy or "RSS_ONLY").strip().upper()
-                policy_used = "RSS_ONLY"
-                excerpt = summary[:1200] if summary else ""
-
-                if policy == "RSS_ONLY":
-                    policy_used = "RSS_ONLY"
-
-                elif policy == "LEAD_3_PARAGRAPHS":
-                    text = try_fetch_and_extract(link)
-                    if text:
-                        lead = lead_paragraphs(text, 3)
-                        sr = score_item(title, summary, lead, s.keywords, s.context_rules, cfg.global_cfg.mode)
-                        label = classify(sr.score, cfg.global_cfg.watch_threshold, cfg.global_cfg.red_threshold)
-                        policy_used = "LEAD_3_PARAGRAPHS"
-                        excerpt = lead if lead else excerpt
-                    else:
-                        policy_used = "RSS_ONLY"
-
-                elif policy == "FULL_TEXT":
-                    # 기본 안전장치: full_text_scope=RED면 RED인 경우에만 FULL_TEXT
-                    text = try_fetch_and_extract(link)
-                    if text:
-                        lead = lead_paragraphs(text, 3)
-                        sr2 = score_item(title, summary, lead, s.keywords, s.context_rules, cfg.global_cfg.mode)
-                        label2 = classify(sr2.score, cfg.global_cfg.watch_threshold, cfg.global_cfg.red_threshold)
-
-                        scope = (cfg.global_cfg.full_text_scope or "RED").strip().upper()
-                        if scope == "ALL" or label2 == "RED":
-                            policy_used = "FULL_TEXT"
-                            sr = sr2
-                            label = label2
-                            excerpt = text[:2500]
-                        else:
-                            policy_used = "LEAD_3_PARAGRAPHS"
-                            sr = sr2
-                            label = label2
-                            excerpt = lead if lead else (summary[:1200] if summary else "")
-                    else:
-                        policy_used = "RSS_ONLY"
-
-                else:
-                    policy_used = "RSS_ONLY"
-
-                item = {
-                    "date": date_str,
-                    "source_id": s.id,
-                    "source_name": s.name,
-                    "title": title if title else "(no title)",
-                    "link": link if link else "",
-                    "published": published,
-                    "score": sr.score,
-                    "label": label,
-                    "policy_used": policy_used,
-                    "matches": compact_matches(sr.matched_keywords, sr.matched_rules),
-                    "excerpt": (excerpt or "").strip(),
+                # 다음 단계 큐에서 기다린 시간이 섞이지 않도록 스코어 계산만 잼
+                with log.span("score", source=s.id):
+                    partial = rules.scan(title, summary)
+                    sr = rules.finalize(partial, cfg.global_cfg.mode)
+                p = {
+                    "key": key,
+                    "source": s,
+                    "rules": rules,
+                    "title": title,
+                    "link": link,
+                    "summary": summary,
+                    "published": get_entry_published(entry),
+                    "partial": partial,
+                    "sr": sr,
+                    "label": classify(sr.score, cfg.global_cfg.watch_threshold, cfg.global_cfg.red_threshold),
+                    "policy": (s.policy or "RSS_ONLY").strip().upper(),
                 }
-
-                mark_seen(state, key, {
-                    "date": date_str,
-                    "source_id": s.id,
-                    "title": item["title"][:200],
-                    "link": item["link"][:500],
-                    "label": item["label"],
-                    "score": item["score"],
-                })
-                new_items.append(item)
+                queued_keys.add(key)
+                with state_lock:
+                    run["left"] += 1
+                dup = None
+                if neardup is not None:
+                    fp = neardup.fingerprint(title, summary)
+                    if fp is not None:
+                        found = neardup.find(fp, key)
+                        # 원본의 제목·링크를 찾을 수 없으면 표시도 본문 재사용도 못 하므로 새 항목으로 취급
+                        dup = dup_origin(found) if found is not None else None
+                        if dup is None:
+                            neardup.add(key, fp, s.id, date_str)
+                            neardup_origins[compact_key(key)] = (title or "(no title)", link)
+                if dup is not None:
+                    p["duplicate_of"] = dup
+                    near_dups["matched"] += 1
+                if p["policy"] in ("LEAD_3_PARAGRAPHS", "FULL_TEXT") and link:
+                    queue_article(p, emit, dup["link"] if dup is not None and dup["link"] != link else None)
+                else:
+                    emit((None, None, "rss", [p]), "score")
 
             except Exception as e:
                 log.error(f"Entry processing failed ({s.id}): {e}\n{traceback.format_exc()}")
+                failed = True
                 continue
+        if entries:
+            with state_lock:
+                run["scanning"] = False
+                run["failed"] = run["failed"] or failed
+                settle_hwm(s.id)
+        if not newest_first:
+            log.info(f"High-water mark: {s.id} not newest-first; full scan", source=s.id)
+        reschedule(s, published_ts, n_new)
+
+    # 3) 본문 다운로드: RSS 점수 높은 링크부터 (재시도 먼저), 소스별 한도와 실행 마감 적용
+    def stage_article(link: str, emit) -> None:
+        with jobs_lock:
+            ps = article_jobs.get(link) or []
+        if ps and not source_budget.take(ps[0]["source"].id):
+            emit((link, None, "per_source", None), "score")
+            return
+        info: Dict[str, Any] = {}
+        try:
+            deadline.check()
+            with host_slots.hold(link), log.span("article_fetch"):
+                html = fetch_html(
+                    link, deadline.timeout(cfg.global_cfg.timeout_sec), cfg.global_cfg.user_agent,
+                    max_bytes=int(cfg.global_cfg.max_html_mb * 1024 * 1024), info=info,
+                )
+        except Exception as e:
+            # 마감으로 잘린 요청(줄어든 timeout)도 예산 초과로 본다
+            if isinstance(e, DeadlineExceeded) or deadline.expired():
+                emit((link, None, "deadline", None), "score")
+            else:
+                log.warn(f"HTML extract failed: {e}")
+                emit((link, None, "failed", None), "score")
+            return
+        if info.get("truncated"):
+            log.warn(f"Page cut at {cfg.global_cfg.max_html_mb:g} MB: {link}", link=link, bytes=info["bytes"])
+        h = None
+        if article_cache is not None:
+            h = html_hash(html)
+            with cache_lock:
+                found, text = article_cache.get_by_html(link, h)
+            if found:
+                emit((link, text, "ok", None), "score")
+                return
+        emit((link, html, h))
+
+    # 4) trafilatura 추출 (extract.workers > 1이면 프로세스 풀)
+    def stage_extract(msg, emit) -> None:
+        link, html, h = msg
+        with log.span("extract"):
+            text = extractor.extract(link, html)
+        if article_cache is not None and h is not None:
+            try:
+                with cache_lock:
+                    article_cache.put(link, h, text)
+            except Exception as e:
+                log.warn(f"Article cache write failed: {e}")
+        emit((link, text, "ok", None))
+
+    # 5) 최종 스코어: 본문 리드로 재스코어, 예산 초과분은 RSS_ONLY
+    def stage_score(msg, emit) -> None:
+        link, text, outcome, ps = msg
+        if ps is None:
+            with jobs_lock:
+                ps = article_jobs.pop(link, [])
+        for p in ps:
+            try:
+                if outcome in ("per_source", "deadline"):
+                    emit(("defer", p, outcome, None if p.get("retry") else make_item(p, None)))
+                elif p.get("retry") and not text:
+                    emit(("drop_retry", p, outcome, None))  # 이미 RSS_ONLY로 기록되어 있음
+                else:
+                    emit(("item", p, outcome, make_item(p, text)))
+            except Exception as e:
+                log.error(f"Entry processing failed ({p['source'].id}): {e}\n{traceback.format_exc()}")
+                emit(("failed", p, outcome, None))
+
+    # 6) 상태/출력: seen 기록, 새 항목, 재시도 대기열
+    def record(kind: str, p: Dict[str, Any], outcome: Optional[str], made) -> None:
+        if made is not None:
+            item, meta = made
+            mark_seen(state, p["key"], meta)
+            (retried_items if p.get("retry") else new_items).append(item)
+        if kind != "defer":
+            if p.get("retry"):
+                retry.pop(p["key"], None)
+            return
+        # 예산 초과: 이번엔 RSS_ONLY로 확정하고 다음 실행에서 먼저 다시 받음
+        deferred[outcome] += 1
+        attempts = int(p.get("retry") or 0) + 1
+        if retry_enabled and attempts <= g.retry_max_attempts:
+            retry[p["key"]] = retry_record(p, p.get("date") or date_str, attempts)
+        else:
+            retry.pop(p["key"], None)
+            if p.get("retry"):
+                log.warn(f"Article retry given up after {attempts - 1} attempts: {p['link']}", source=p["source"].id)
+
+    def stage_sink(msg, emit) -> None:
+        kind, p, outcome, made = msg
+        with state_lock:
+            recorded = False
+            try:
+                if kind != "failed":
+                    record(kind, p, outcome, made)
+                    recorded = True
+            finally:
+                run = None if p.get("retry") else hwm_runs.get(p["source"].id)
+                if run is not None:
+                    run["left"] -= 1
+                    run["failed"] = run["failed"] or not recorded
+                    settle_hwm(p["source"].id)
+
+    def stage_error(stage: str, item: Any, e: BaseException) -> None:
+        log.error(f"Pipeline stage {stage} failed: {e}\n{''.join(traceback.format_exception(e))}", stage=stage)
+
+    qsize = g.pipeline_queue_size
+    pipeline = Pipeline([
+        Stage("feed", stage_feed, workers=g.max_concurrency, queue_size=qsize),
+        Stage("entries", stage_entries, workers=1, queue_size=qsize),
+        Stage("article", stage_article, workers=g.max_concurrency, queue_size=qsize, priority=article_priority),
+        Stage("extract", stage_extract, workers=g.extract_workers, queue_size=qsize),
+        Stage("score", stage_score, workers=g.score_workers, queue_size=qsize),
+        Stage("sink", stage_sink, workers=1, queue_size=qsize),
+    ], on_error=stage_error)
+
+    log.info(
+        f"Fetching {len(due_sources)} feeds "
+        f"(max_concurrency={cfg.global_cfg.max_concurrency}, per_host={cfg.global_cfg.per_host_concurrency}, "
+        f"extract workers={g.extract_workers}, queue={qsize})"
+    )
+    with log.span("pipeline", sources=len(due_sources)):
+        pipeline.start()
+        # 예산 초과 재시도 대기열: item log가 있어야 원래 항목을 바꿔 쓸 수 있음
+        n_retries = 0
+        for key, r in list(retry.items()):
+            s = sources_by_id.get(r.get("source_id"))
+            policy = (s.policy or "RSS_ONLY").strip().upper() if s is not None else ""
+            if not retry_enabled or policy not in ("LEAD_3_PARAGRAPHS", "FULL_TEXT") or not r.get("link"):
+                retry.pop(key, None)
+                continue
+            partial = s.rules.scan(r.get("title") or "", r.get("summary") or "")
+            sr = s.rules.finalize(partial, g.mode)
+            queued_keys.add(key)
+            n_retries += 1
+            queue_article({
+                "key": key,
+                "source": s,
+                "rules": s.rules,
+                "title": r.get("title") or "",
+                "link": r["link"],
+                "summary": r.get("summary") or "",
+                "published": r.get("published"),
+                "partial": partial,
+                "sr": sr,
+                "label": classify(sr.score, g.watch_threshold, g.red_threshold),
+                "policy": policy,
+                "date": r.get("date") or date_str,
+                "retry": int(r.get("attempts") or 1),
+            }, pipeline.put)
+        if n_retries:
+            log.info(f"Article retry: {n_retries} entries deferred by earlier runs queued first", retries=n_retries)
+        for s in due_sources:
+            pipeline.put(s)
+        pipeline.close()
+        pipeline.join()
+    extractor.close()
+    log.info("Pipeline stages", pipeline=pipeline.stats())
+
+    if article_cache is not None:
+        try:
+            size = article_cache.evict()
+            log.info(f"Article cache: {article_cache.summary()} size_bytes={size}")
+        except Exception as e:
+            log.error(f"Article cache eviction failed: {e}")
+
+    if deferred["per_source"] or deferred["deadline"] or retry:
+        log.info(
+            f"Article budget: deferred per_source={deferred['per_source']} deadline={deferred['deadline']}, "
+            f"{len(retry)} queued for retry", **deferred, retry_queue=len(retry),
+        )
+    if near_dups["matched"]:
+        log.info(
+            f"Near-duplicates: {near_dups['matched']} entries matched earlier items, "
+            f"{near_dups['reused_text']} reused their article text", **near_dups,
+        )
+    log.info(f"Feed cache: hit={cache_hits} miss={cache_misses}")
+    if isinstance(state, BloomFrontStore):
+        log.info(f"Bloom filter: {state.summary()}", **state.stats)
 
     # 정렬
-    order = {"RED": 0, "WATCH": 1, "GREEN": 2}
-    new_items.sort(key=lambda x: (order.get(x["label"], 9), -int(x["score"])))
+    new_items.sort(key=sort_key)
+
+    # item log: 이번 실행분을 정렬된 run으로 추가 → 하루 전체 리포트/다이제스트는 run 병합으로
+    item_log: Optional[ItemLog] = None
+    day: Optional[Dict[str, Any]] = None
+    if cfg.global_cfg.items_dir:
+        try:
+            item_log = ItemLog(cfg.global_cfg.items_dir)
+            day = item_log.append(date_str, new_items, top_k=cfg.global_cfg.max_items_per_section)
+            log.info(f"Item log: +{len(new_items)} items, {len(day['runs'])} runs today", counts=day["counts"])
+        except Exception as e:
+            log.error(f"Failed to append item log: {e}")
+            item_log = day = None
+
+    # 재시도로 본문을 받은 항목은 원래 날짜의 로그에서 교체, 지난 날짜는 리포트도 다시 씀
+    if item_log is not None and retried_items:
+        by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for it in retried_items:
+            by_date.setdefault(it["date"], []).append(it)
+        for d, its in sorted(by_date.items()):
+            try:
+                meta = item_log.replace(d, its, top_k=cfg.global_cfg.max_items_per_section)
+                if meta is None:
+                    continue
+                if d == date_str:
+                    day = meta
+                else:
+                    write_daily_file(f"out/daily/daily_{d}.md", d, item_log.merged(d), cfg.global_cfg.include_green_in_md, meta["counts"])
+                log.info(f"Item log: {len(its)} retried items updated for {d}", date=d, items=len(its))
+            except Exception as e:
+                log.error(f"Failed to update retried items for {d}: {e}")
 
     # daily md 저장
     out_md = f"out/daily/daily_{date_str}.md"
     try:
-        md = render_daily_markdown(date_str, new_items, include_green=cfg.global_cfg.include_green_in_md)
-        with open(out_md, "w", encoding="utf-8") as f:
-            f.write(md)
+        if item_log is not None and day is not None:
+            with log.span("render", items=sum(day["counts"].values()), runs=len(day["runs"])):
+                write_daily_file(out_md, date_str, item_log.merged(date_str), cfg.global_cfg.include_green_in_md, day["counts"])
+        else:
+            with log.span("render", items=len(new_items)):
+                counts: Dict[str, int] = {}
+                for it in new_items:
+                    counts[it["label"]] = counts.get(it["label"], 0) + 1
+                write_daily_file(out_md, date_str, new_items, cfg.global_cfg.include_green_in_md, counts)
         log.info(f"Wrote {out_md}")
     except Exception as e:
         log.error(f"Failed to write daily md: {e}")
 
     # state 저장
     try:
-        save_state(args.state, state)
-        log.info("Saved state.json")
+        with log.span("save"):
+            save_state(args.state, state)
+        log.info(f"Saved state: {args.state}")
     except Exception as e:
         log.error(f"Failed save_state: {e}")
 
@@ -248,16 +802,27 @@ def main():
             if last_sent == date_str:
                 log.info(f"Telegram already sent for {date_str}; skipping")
             else:
-                if len(new_items) == 0:
-                    log.info("No new items; telegram skipped")
+                day_total = sum(day["counts"].values()) if day is not None else len(new_items)
+                if day_total == 0:
+                    log.info("No items today; telegram skipped")
                 else:
-                    msg = build_digest_message(
-                        date_str=date_str,
-                        items=new_items,
-                        max_items_per_section=cfg.global_cfg.max_items_per_section,
-                        include_green=cfg.global_cfg.include_green_in_telegram,
-                    )
-                    send_telegram_message(bot_token, chat_id, msg, timeout_sec=cfg.global_cfg.timeout_sec)
+                    # item log가 있으면 그날 전체(사이드카)로, 없으면 이번 실행분만
+                    if day is not None:
+                        msg = build_digest_from_summary(
+                            date_str=date_str,
+                            summary=day,
+                            max_items_per_section=cfg.global_cfg.max_items_per_section,
+                            include_green=cfg.global_cfg.include_green_in_telegram,
+                        )
+                    else:
+                        msg = build_digest_message(
+                            date_str=date_str,
+                            items=new_items,
+                            max_items_per_section=cfg.global_cfg.max_items_per_section,
+                            include_green=cfg.global_cfg.include_green_in_telegram,
+                        )
+                    with log.span("telegram"):
+                        send_telegram_message(bot_token, chat_id, msg, timeout_sec=cfg.global_cfg.timeout_sec)
                     set_last_sent_date(state, date_str)
                     save_state(args.state, state)
                     log.info("Telegram sent and state updated")
@@ -266,6 +831,12 @@ def main():
     except Exception as e:
         log.error(f"Telegram send failed: {e}")
 
+    close_session()
+    state.close()
+    table = log.summary()
+    log.close()
+    print(table)
+    print(pipeline.report())
     print(f"OK: items={len(new_items)} -> {out_md} (log: {lp})")
 
 
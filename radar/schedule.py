@@ -0,0 +1,109 @@
+from __future__ import annotations
+import calendar
+from typing import Any, Dict, List, Optional
+
+# 최근 published 시각은 이만큼만 보관
+KEEP_PUBLISHED = 50
+
+def entry_timestamp(entry: Any) -> Optional[int]:
+    """Epoch seconds of an entry's published (else updated) time, if feedparser could parse one."""
+    for k in ("published_parsed", "updated_parsed"):
+        t = entry.get(k)
+        if t:
+            try:
+                return int(calendar.timegm(t))
+            except Exception:
+                continue
+    return None
+
+def is_due(sched: Dict[str, Any], now: int, slack_sec: int) -> bool:
+    """A source with no schedule yet is always due; slack absorbs cron jitter."""
+    next_due = sched.get("next_due")
+    return next_due is None or int(next_due) <= now + slack_sec
+
+def publish_gap(published: List[int]) -> Optional[float]:
+    """Median gap in seconds between consecutive distinct publish times, or None with fewer than two."""
+    ts = sorted(set(published))
+    gaps = sorted(b - a for a, b in zip(ts, ts[1:]) if b > a)
+    if not gaps:
+        return None
+    return float(gaps[len(gaps) // 2])
+
+def update_schedule(
+    sched: Dict[str, Any],
+    now: int,
+    published: List[int],
+    new_entries: Optional[int],
+    min_sec: int,
+    max_sec: int,
+    target_new: int,
+    window: int,
+) -> str:
+    """
+    Record one fetch of a source and set its next_due. new_entries is None
+    when the feed was unchanged (304 / same body). The interval aims at
+    about target_new new entries per poll from the median publish gap, is
+    kept below half the feed window (window = entries read per fetch) so no
+    entry can scroll out between polls, and falls back to the observed
+    new-entry rate or, with nothing new, a 1.5x back-off. Returns the reason.
+    """
+    last_fetch = sched.get("last_fetch")
+    prev = int(sched.get("interval") or min_sec)
+    elapsed = max(1, now - int(last_fetch)) if last_fetch else None
+
+    if published:
+        keep = sorted(set(published) | set(sched.get("published") or []))[-KEEP_PUBLISHED:]
+        sched["published"] = keep
+    gap = publish_gap(sched.get("published") or [])
+
+    if new_entries and elapsed:
+        rate = new_entries / elapsed
+        # EWMA of new entries per second
+        sched["rate"] = rate if sched.get("rate") is None else 0.5 * float(sched["rate"]) + 0.5 * rate
+
+    if gap is not None and new_entries:
+        interval, reason = gap * max(1, target_new), f"publish gap {gap / 60:.0f}m"
+        interval = min(interval, gap * max(1, window) / 2)
+    elif new_entries and sched.get("rate"):
+        interval, reason = max(1, target_new) / float(sched["rate"]), "observed rate"
+    else:
+        interval, reason = prev * 1.5, "nothing new, backing off"
+
+    interval = int(min(max_sec, max(min_sec, interval)))
+    sched["interval"] = interval
+    sched["last_fetch"] = now
+    sched["next_due"] = now + interval
+    if new_entries is not None:
+        sched["last_new"] = new_entries
+    return reason
+
+# high-water mark: 이 횟수만큼 연속으로 최신순이 확인된 피드만 조기 종료
+ORDERED_STREAK_MIN = 2
+
+def is_newest_first(timestamps: List[Optional[int]]) -> bool:
+    """True if every entry has a publish time and they never increase down the feed."""
+    if len(timestamps) < 2 or any(t is None for t in timestamps):
+        return False
+    return all(a >= b for a, b in zip(timestamps, timestamps[1:]))
+
+def hwm_usable(hwm: Dict[str, Any], newest_first: bool) -> bool:
+    """Early exit only for a feed that is newest-first now and was on the previous fetches."""
+    return newest_first and bool(hwm.get("ident")) and int(hwm.get("ordered_streak") or 0) >= ORDERED_STREAK_MIN - 1
+
+def hwm_reached(hwm: Dict[str, Any], ident: str, ts: Optional[int], seen: bool) -> bool:
+    """
+    The entry is the stored mark, or an already-seen entry no newer than it.
+    The timestamp only tells where the mark was: an unseen entry below it can
+    still be new (inserted after the last fetch) and never ends the scan.
+    """
+    if ident == hwm.get("ident"):
+        return True
+    if not seen:
+        return False
+    mark = hwm.get("published")
+    return ts is None or mark is None or ts <= int(mark)
+
+def update_hwm(hwm: Dict[str, Any], top_ident: str, top_ts: Optional[int], newest_first: bool) -> None:
+    hwm["ident"] = top_ident
+    hwm["published"] = top_ts
+    hwm["ordered_streak"] = int(hwm.get("ordered_streak") or 0) + 1 if newest_first else 0
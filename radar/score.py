@@ -1,6 +1,7 @@
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 
 @dataclass
 class ScoreResult:
@@ -8,10 +9,373 @@ class ScoreResult:
     matched_keywords: List[Tuple[str, int, int]]  # (term, weight, count)
     matched_rules: List[Tuple[str, int]]          # (rule_name, added_score)
 
-def _count_occurrences(text: str, term: str) -> int:
-    if not text or not term:
-        return 0
-    return text.lower().count(term.lower())
+@dataclass
+class PartialScore:
+    """
+    Raw match counts for the text scanned so far. The RSS pass scans title and
+    summary once; a later body segment only adds its own counts.
+    """
+    title: str
+    summary: str
+    body: str
+    title_counts: List[int]
+    other_counts: List[int]
+
+@dataclass
+class BatchScores:
+    """
+    Columnar result of score_batch. Matches are flat arrays: item i's keyword
+    hits are kw_ids/kw_counts[kw_offsets[i]:kw_offsets[i + 1]] (indexes into
+    rules.keywords), its rule hits rule_ids/rule_adds[rule_offsets[i]:...].
+    labels is empty unless thresholds were given.
+    """
+    rules: "CompiledRules"
+    scores: List[int]
+    labels: List[str]
+    kw_offsets: List[int]
+    kw_ids: List[int]
+    kw_counts: List[int]
+    rule_offsets: List[int]
+    rule_ids: List[int]
+    rule_adds: List[int]
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def matched_keywords(self, i: int) -> List[Tuple[str, int, int]]:
+        a, b = self.kw_offsets[i], self.kw_offsets[i + 1]
+        kws = self.rules.keywords
+        return [(kws[k][0], kws[k][1], c) for k, c in zip(self.kw_ids[a:b], self.kw_counts[a:b])]
+
+    def matched_rules(self, i: int) -> List[Tuple[str, int]]:
+        a, b = self.rule_offsets[i], self.rule_offsets[i + 1]
+        return [(self.rules.rules[r][0], add) for r, add in zip(self.rule_ids[a:b], self.rule_adds[a:b])]
+
+    def matches(self, i: int) -> Tuple[List[Tuple[str, int, int]], List[Tuple[str, int]]]:
+        """(matched_keywords, matched_rules) of item i, as compact_matches takes them."""
+        return self.matched_keywords(i), self.matched_rules(i)
+
+class Keyword:
+    """One validated keyword: display term, lowercased match term, integer weight and its score cap."""
+    __slots__ = ("term", "term_l", "weight", "cap")
+
+    def __init__(self, term: str, weight: int):
+        self.term = term
+        self.term_l = term.lower()
+        self.weight = weight
+        # aggressive 모드는 여기에 +3
+        self.cap = weight * 12
+
+    @classmethod
+    def parse(cls, raw: Any, ctx: str) -> Optional["Keyword"]:
+        """Keyword from a config mapping; None for a blank term."""
+        if not isinstance(raw, dict):
+            raise ValueError(f"Expected a mapping in {ctx}")
+        term = str(raw.get("term", "")).strip()
+        if not term:
+            return None
+        return cls(term, _int(raw.get("weight", 1), f"{ctx}.weight"))
+
+class ContextRule:
+    """One validated context rule; patterns are lowercased, "" for a blank pattern (never hits)."""
+    __slots__ = ("name", "weight", "match_all", "patterns")
+
+    def __init__(self, name: str, weight: int, match_all: bool, patterns: Tuple[str, ...]):
+        self.name = name
+        self.weight = weight
+        self.match_all = match_all
+        self.patterns = patterns
+
+    @classmethod
+    def parse(cls, raw: Any, ctx: str) -> "ContextRule":
+        if not isinstance(raw, dict):
+            raise ValueError(f"Expected a mapping in {ctx}")
+        patterns = raw.get("patterns", []) or []
+        if not isinstance(patterns, list):
+            raise ValueError(f"Expected a list in {ctx}.patterns")
+        return cls(
+            name=str(raw.get("name", "rule")).strip(),
+            weight=_int(raw.get("weight", 1), f"{ctx}.weight"),
+            match_all=str(raw.get("match", "any")).lower() != "any",
+            patterns=tuple(str(p).strip().lower() for p in patterns),
+        )
+
+def _int(value: Any, ctx: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Expected an integer in {ctx}, got {value!r}") from None
+
+def parse_keywords(raw: Any, ctx: str = "keywords") -> List[Keyword]:
+    if not isinstance(raw or [], list):
+        raise ValueError(f"Expected a list in {ctx}")
+    out = [Keyword.parse(kw, f"{ctx}[{j}]") for j, kw in enumerate(raw or [])]
+    return [kw for kw in out if kw is not None]
+
+def parse_context_rules(raw: Any, ctx: str = "context_rules") -> List[ContextRule]:
+    if not isinstance(raw or [], list):
+        raise ValueError(f"Expected a list in {ctx}")
+    return [ContextRule.parse(r, f"{ctx}[{j}]") for j, r in enumerate(raw or [])]
+
+class _Automaton:
+    """
+    Aho-Corasick automaton over lowercased terms. count() scans a text once and
+    returns, per term, the same non-overlapping count str.count() would give.
+    """
+    __slots__ = ("goto", "fail", "out", "lengths", "alphabet")
+
+    def __init__(self, terms: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[List[int]] = [[]]
+        self.lengths = [len(t) for t in terms]
+        self.alphabet = frozenset("".join(terms))
+        for tid, term in enumerate(terms):
+            node = 0
+            for ch in term:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(tid)
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def count(self, text: str) -> List[int]:
+        goto, fail, out, lengths, alphabet = self.goto, self.fail, self.out, self.lengths, self.alphabet
+        counts = [0] * len(lengths)
+        next_free = [0] * len(lengths)  # str.count semantics: matches of one term never overlap
+        node = 0
+        for i, ch in enumerate(text):
+            if ch not in alphabet:
+                node = 0
+                continue
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for tid in out[node]:
+                if i + 1 - lengths[tid] >= next_free[tid]:
+                    counts[tid] += 1
+                    next_free[tid] = i + 1
+        return counts
+
+class _TermCounter:
+    """Per-term str.count on an already-lowercased text; cheaper than the automaton for short term lists."""
+    __slots__ = ("terms",)
+
+    def __init__(self, terms: List[str]):
+        self.terms = terms
+
+    def count(self, text: str) -> List[int]:
+        return [text.count(t) for t in self.terms]
+
+# Above this many distinct terms one automaton pass beats len(terms) C-level scans.
+AUTOMATON_MIN_TERMS = 256
+
+class CompiledRules:
+    """
+    Keywords and context rules of one source, normalized once. Keyword terms
+    and rule patterns are deduplicated into one term list; each text field is
+    lowercased once and counted against all terms, through an Aho-Corasick
+    automaton once the list is long enough for a single pass to pay off.
+    """
+    __slots__ = ("keywords", "rules", "terms", "matcher", "multiline_ids")
+
+    def __init__(self, keywords: Sequence[Any], context_rules: Sequence[Any]):
+        # 설정에서 온 Keyword/ContextRule은 그대로, 원시 dict는 여기서 검증
+        if any(not isinstance(kw, Keyword) for kw in keywords or []):
+            keywords = parse_keywords(keywords)
+        if any(not isinstance(r, ContextRule) for r in context_rules or []):
+            context_rules = parse_context_rules(context_rules)
+        term_ids: Dict[str, int] = {}
+
+        def intern(s: str) -> int:
+            if s not in term_ids:
+                term_ids[s] = len(term_ids)
+            return term_ids[s]
+
+        # (term, weight, term_id, cap)
+        self.keywords: List[Tuple[str, int, int, int]] = [
+            (kw.term, kw.weight, intern(kw.term_l), kw.cap) for kw in keywords or []
+        ]
+
+        # (name, weight, match_all, pattern term_ids (-1 = blank, never hits), pattern count)
+        self.rules: List[Tuple[str, int, bool, List[int], int]] = []
+        for rule in (context_rules or []):
+            ids = [intern(p) if p else -1 for p in rule.patterns]
+            self.rules.append((rule.name, rule.weight, rule.match_all, ids, len(rule.patterns)))
+
+        self.terms: List[str] = list(term_ids)
+        self.multiline_ids = [tid for tid, t in enumerate(self.terms) if "\n" in t]
+        if len(self.terms) >= AUTOMATON_MIN_TERMS:
+            self.matcher = _Automaton(self.terms)
+        else:
+            self.matcher = _TermCounter(self.terms)
+
+    def scan(self, title: str, summary: str) -> PartialScore:
+        title = title or ""
+        summary = summary or ""
+        return PartialScore(
+            title=title,
+            summary=summary,
+            body="",
+            title_counts=self.matcher.count(title.lower()),
+            other_counts=self.matcher.count(summary.lower()),
+        )
+
+    def extend(self, partial: PartialScore, body: str) -> PartialScore:
+        """Add the body to an RSS-pass partial without rescanning title or summary."""
+        if partial.body:
+            raise ValueError("partial score already has a body")
+        body = body or ""
+        body_counts = self.matcher.count(body.lower())
+        other_counts = [a + b for a, b in zip(partial.other_counts, body_counts)]
+        if self.multiline_ids:
+            # only terms containing a newline can straddle the summary/body join
+            other_l = (partial.summary + "\n" + body).lower()
+            for tid in self.multiline_ids:
+                other_counts[tid] = other_l.count(self.terms[tid])
+        return PartialScore(
+            title=partial.title,
+            summary=partial.summary,
+            body=body,
+            title_counts=partial.title_counts,
+            other_counts=other_counts,
+        )
+
+    def score(self, title: str, summary: str, body: str, mode: str = "aggressive") -> ScoreResult:
+        return self.finalize(self.extend(self.scan(title, summary), body), mode)
+
+    def finalize(self, partial: PartialScore, mode: str = "aggressive") -> ScoreResult:
+        """Apply weights, per-keyword caps and rule any/all semantics to the accumulated counts."""
+        kw_ids: List[int] = []
+        kw_counts: List[int] = []
+        rule_ids: List[int] = []
+        rule_adds: List[int] = []
+        total = self._tally(
+            partial.title, partial.summary, partial.body, partial.title_counts, partial.other_counts,
+            (mode or "").lower() == "aggressive", kw_ids, kw_counts, rule_ids, rule_adds,
+        )
+        mk = [(self.keywords[k][0], self.keywords[k][1], c) for k, c in zip(kw_ids, kw_counts)]
+        mr = [(self.rules[r][0], add) for r, add in zip(rule_ids, rule_adds)]
+        return ScoreResult(score=total, matched_keywords=mk, matched_rules=mr)
+
+    def _tally(
+        self,
+        title: str,
+        summary: str,
+        body: str,
+        c_titles: List[int],
+        c_others: List[int],
+        aggressive: bool,
+        kw_ids: List[int],
+        kw_counts: List[int],
+        rule_ids: List[int],
+        rule_adds: List[int],
+    ) -> int:
+        # 매치 결과는 인덱스 배열에 덧붙이고 총점만 반환
+        total = 0
+        cap_bonus = 3 if aggressive else 0
+
+        # Keyword scoring
+        for k, (term, w, tid, cap) in enumerate(self.keywords):
+            c_title = c_titles[tid]
+            c_other = c_others[tid]
+            c = c_title + c_other
+            if c <= 0:
+                continue
+
+            if aggressive:
+                part = (c_title * w * 3) + (c_other * w)
+                if c_title > 0:
+                    part += 2
+            else:
+                part = c * w
+
+            part = min(part, cap + cap_bonus)
+            total += part
+            kw_ids.append(k)
+            kw_counts.append(c)
+
+        # Context rules scoring
+        blob_l: Optional[str] = None
+        for r, (name, w, match_all, ids, n_patterns) in enumerate(self.rules):
+            hits = 0
+            for tid in ids:
+                if tid < 0:
+                    continue
+                if c_titles[tid] or c_others[tid]:
+                    hits += 1
+                elif "\n" in self.terms[tid]:
+                    # a multi-line pattern can straddle the title/summary boundary
+                    if blob_l is None:
+                        blob_l = f"{title}\n{summary}\n{body}".strip().lower()
+                    if self.terms[tid] in blob_l:
+                        hits += 1
+
+            ok = (hits == n_patterns and n_patterns > 0) if match_all else (hits > 0)
+            if ok:
+                add = w * (2 if aggressive else 1)
+                total += add
+                rule_ids.append(r)
+                rule_adds.append(add)
+
+        return int(total)
+
+    def score_batch(
+        self,
+        items: Iterable[Tuple[str, str, str]],
+        mode: str = "aggressive",
+        watch_threshold: Optional[int] = None,
+        red_threshold: Optional[int] = None,
+    ) -> BatchScores:
+        """
+        Score many (title, summary, body) tuples in one call, with the same
+        results as score() per item but no per-item result objects.
+        """
+        aggressive = (mode or "").lower() == "aggressive"
+        count = self.matcher.count
+        multiline = [(tid, self.terms[tid]) for tid in self.multiline_ids]
+        out = BatchScores(self, [], [], [0], [], [], [0], [], [])
+        for title, summary, body in items:
+            title = title or ""
+            summary = summary or ""
+            body = body or ""
+            c_titles = count(title.lower())
+            summary_l = summary.lower()
+            c_others = count(summary_l)
+            if body:
+                body_l = body.lower()
+                c_others = [a + b for a, b in zip(c_others, count(body_l))]
+                if multiline:
+                    other_l = summary_l + "\n" + body_l
+                    for tid, term in multiline:
+                        c_others[tid] = other_l.count(term)
+            out.scores.append(self._tally(
+                title, summary, body, c_titles, c_others, aggressive,
+                out.kw_ids, out.kw_counts, out.rule_ids, out.rule_adds,
+            ))
+            out.kw_offsets.append(len(out.kw_ids))
+            out.rule_offsets.append(len(out.rule_ids))
+        if watch_threshold is not None and red_threshold is not None:
+            out.labels = classify_many(out.scores, watch_threshold, red_threshold)
+        return out
+
+def compile_rules(keywords: Sequence[Any], context_rules: Sequence[Any]) -> CompiledRules:
+    return CompiledRules(keywords, context_rules)
 
 def score_item(
     title: str,
@@ -21,60 +385,16 @@ def score_item(
     context_rules: List[Dict[str, Any]],
     mode: str = "aggressive",
 ) -> ScoreResult:
-    title = title or ""
-    summary = summary or ""
-    body = body or ""
-    blob = f"{title}\n{summary}\n{body}".strip()
-
-    aggressive = (mode or "").lower() == "aggressive"
-    total = 0
-    mk: List[Tuple[str, int, int]] = []
-    mr: List[Tuple[str, int]] = []
-
-    # Keyword scoring
-    for kw in (keywords or []):
-        term = str(kw.get("term", "")).strip()
-        if not term:
-            continue
-        w = int(kw.get("weight", 1))
-
-        c_title = _count_occurrences(title, term)
-        c_other = _count_occurrences(summary + "\n" + body, term)
-        c = c_title + c_other
-        if c <= 0:
-            continue
-
-        if aggressive:
-            part = (c_title * w * 3) + (c_other * w)
-            if c_title > 0:
-                part += 2
-        else:
-            part = c * w
+    return compile_rules(keywords, context_rules).score(title, summary, body, mode)
 
-        part = min(part, w * 12 + (3 if aggressive else 0))
-        total += part
-        mk.append((term, w, c))
-
-    # Context rules scoring
-    for rule in (context_rules or []):
-        name = str(rule.get("name", "rule")).strip()
-        patterns = rule.get("patterns", []) or []
-        w = int(rule.get("weight", 1))
-        match_mode = str(rule.get("match", "any")).lower()
-
-        hits = 0
-        for p in patterns:
-            p = str(p).strip()
-            if p and (p.lower() in blob.lower()):
-                hits += 1
-
-        ok = (hits > 0) if match_mode == "any" else (hits == len(patterns) and len(patterns) > 0)
-        if ok:
-            add = w * (2 if aggressive else 1)
-            total += add
-            mr.append((name, add))
-
-    return ScoreResult(score=int(total), matched_keywords=mk, matched_rules=mr)
+def score_batch(
+    items: Iterable[Tuple[str, str, str]],
+    rules: CompiledRules,
+    mode: str = "aggressive",
+    watch_threshold: Optional[int] = None,
+    red_threshold: Optional[int] = None,
+) -> BatchScores:
+    return rules.score_batch(items, mode, watch_threshold, red_threshold)
 
 def classify(score: int, watch_threshold: int, red_threshold: int) -> str:
     if score >= red_threshold:
@@ -82,3 +402,6 @@ def classify(score: int, watch_threshold: int, red_threshold: int) -> str:
     if score >= watch_threshold:
         return "WATCH"
     return "GREEN"
+
+def classify_many(scores: Iterable[int], watch_threshold: int, red_threshold: int) -> List[str]:
+    return ["RED" if sc >= red_threshold else "WATCH" if sc >= watch_threshold else "GREEN" for sc in scores]
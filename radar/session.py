@@ -0,0 +1,47 @@
+from __future__ import annotations
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_pool_connections = 16
+_pool_maxsize = 4
+
+def configure_http(pool_connections: int, pool_maxsize: int) -> None:
+    """
+    Set the pool sizing for the shared session. pool_connections is the number
+    of per-host pools kept alive, pool_maxsize the keep-alive connections per
+    host. Replaces any session created with previous settings.
+    """
+    global _session, _pool_connections, _pool_maxsize
+    with _lock:
+        _pool_connections = max(1, int(pool_connections))
+        _pool_maxsize = max(1, int(pool_maxsize))
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def _build_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_pool_connections, pool_maxsize=_pool_maxsize)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def close_session() -> None:
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
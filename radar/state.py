@@ -1,58 +1,475 @@
 from __future__ import annotations
+import argparse
+import base64
+import hashlib
 import json
+import os
+import sqlite3
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional
 
-def load_state(path: str) -> Dict[str, Any]:
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+STATE_VERSION = 2
+
+# in-memory seen record: (first_seen, last_seen, source index, date YYYYMMDD, label, score[, title, link])
+F_FIRST, F_LAST, F_SOURCE, F_DATE, F_LABEL, F_SCORE, F_TITLE, F_LINK = range(8)
+LABELS = ("RED", "WATCH", "GREEN")
+_LABEL_CODES = {name: i for i, name in enumerate(LABELS)}
+KEY_BYTES = 12
+KEY_CHARS = 16  # base64 of KEY_BYTES
+
+def compact_key(key: str) -> str:
+    """stable_key (40-hex SHA-1) -> 16-char base64url of its first 12 bytes."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"version": 1, "seen": {}, "telegram": {"last_sent_date": None}}
+        digest = bytes.fromhex(key) if len(key) == 40 else b""
+    except ValueError:
+        digest = b""
+    if not digest:
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest[:KEY_BYTES]).decode("ascii")
+
+def _pack_date(date_str: Any) -> Any:
+    try:
+        y, m, d = str(date_str).split("-")
+        return int(y) * 10000 + int(m) * 100 + int(d)
     except Exception:
-        return {"version": 1, "seen": {}, "telegram": {"last_sent_date": None}}
-
-def save_state(path: str, state: Dict[str, Any]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
-
-def is_seen(state: Dict[str, Any], key: str) -> bool:
-    return key in (state.get("seen") or {})
-
-def mark_seen(state: Dict[str, Any], key: str, meta: Dict[str, Any]) -> None:
-    seen = state.setdefault("seen", {})
-    now = datetime.now(timezone.utc).isoformat()
-    if key not in seen:
-        seen[key] = {"first_seen": now}
-    seen[key].update({"last_seen": now, **meta})
-
-def prune_seen(state: Dict[str, Any], keep_days: int) -> int:
-    seen = state.get("seen") or {}
-    if not isinstance(seen, dict):
-        state["seen"] = {}
-        return 0
-    cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days)
-    to_del = []
-    for k, v in seen.items():
+        return date_str
+
+def _unpack_date(value: Any) -> Any:
+    if isinstance(value, int):
+        return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+    return value
+
+def _pack_label(label: Any) -> Any:
+    return _LABEL_CODES.get(label, label)
+
+def _unpack_label(value: Any) -> Any:
+    if isinstance(value, int) and 0 <= value < len(LABELS):
+        return LABELS[value]
+    return value
+
+def _empty_state() -> Dict[str, Any]:
+    return {"version": STATE_VERSION, "sources": [], "seen": {}, "telegram": {"last_sent_date": None}}
+
+def _parse_ts(value: Any) -> Optional[int]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+    except Exception:
+        return None
+
+class StateStore:
+    """
+    Seen-store backend. Functions below (is_seen, mark_seen, ...) are the
+    public API; they delegate here so callers don't care which backend
+    load_state picked. Keys are stored in compact_key form.
+    """
+    path: str
+
+    def is_seen(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def mark_seen(self, key: str, meta: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def prune_seen(self, keep_days: int) -> int:
+        raise NotImplementedError
+
+    def drop_titles(self) -> int:
+        """Clear title/link on every seen record (dedupe.store_titles off); returns how many had them."""
+        raise NotImplementedError
+
+    def iter_seen(self) -> Iterator[Dict[str, Any]]:
+        """Every seen record as a dict (key, first_seen, last_seen, date, source_id, title, link, label, score)."""
+        raise NotImplementedError
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """Mutable dict persisted on save (telegram, feeds, ...)."""
+        raise NotImplementedError
+
+    def save(self, path: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class JsonStateStore(StateStore):
+    """
+    The single-file state.json, loaded and rewritten in full.
+
+    Format v2 stores `seen` column-wise: all compact keys concatenated into
+    one string, then one integer array per field (last_seen delta-encoded,
+    first_seen as an age relative to last_seen, source ids interned in
+    `sources`, labels as LABELS indexes). title/link columns are written only
+    when some record carries them. Rows are in ascending last_seen order;
+    in memory `seen` is a dict of tuples in that same order (mark_seen moves
+    a key to the end), so prune_seen stops at the first unexpired entry.
+    v1 files (hex keys, dict records, ISO or epoch timestamps) are upgraded
+    on load.
+    """
+
+    def __init__(self, path: str, data: Optional[Dict[str, Any]] = None):
+        self.path = path
+        data = data if data is not None else _empty_state()
+        if int(data.get("version") or 1) < 2:
+            data = _upgrade_v1(data)
+        if not isinstance(data.get("sources"), list):
+            data["sources"] = []
+        if not isinstance(data.get("seen"), dict):
+            data["seen"] = {}
+        elif "keys" in data["seen"]:
+            data["seen"] = _decode_columns(data["seen"])
+        self.data = data
+        self.seen: Dict[str, tuple] = data["seen"]
+        self.sources: List[str] = data["sources"]
+        self._source_index = {sid: i for i, sid in enumerate(self.sources)}
+
+    @classmethod
+    def load(cls, path: str) -> "JsonStateStore":
         try:
-            last = v.get("last_seen")
-            if not last:
-                continue
-            dt = datetime.fromisoformat(last.replace("Z", "+00:00"))
-            if dt < cutoff:
-                to_del.append(k)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(path, data if isinstance(data, dict) else None)
+        except FileNotFoundError:
+            return cls(path)
         except Exception:
+            return cls(path)
+
+    def _intern(self, source_id: Any) -> int:
+        sid = str(source_id or "")
+        idx = self._source_index.get(sid)
+        if idx is None:
+            idx = self._source_index[sid] = len(self.sources)
+            self.sources.append(sid)
+        return idx
+
+    def is_seen(self, key: str) -> bool:
+        return compact_key(key) in self.seen
+
+    def mark_seen(self, key: str, meta: Dict[str, Any]) -> None:
+        ck = compact_key(key)
+        now = int(datetime.now(timezone.utc).timestamp())
+        old = self.seen.pop(ck, None)
+        rec = (
+            old[F_FIRST] if old else now,
+            now,
+            self._intern(meta.get("source_id")),
+            _pack_date(meta.get("date")),
+            _pack_label(meta.get("label")),
+            meta.get("score"),
+        )
+        if meta.get("title") is not None or meta.get("link") is not None:
+            rec += (meta.get("title"), meta.get("link"))
+        self.seen[ck] = rec
+
+    def prune_seen(self, keep_days: int) -> int:
+        cutoff = int((datetime.now(timezone.utc) - timedelta(days=keep_days)).timestamp())
+        to_del = []
+        for k, rec in self.seen.items():
+            if rec[F_LAST] >= cutoff:
+                break
+            to_del.append(k)
+        for k in to_del:
+            del self.seen[k]
+        return len(to_del)
+
+    def drop_titles(self) -> int:
+        n = 0
+        for k, rec in self.seen.items():
+            if len(rec) > F_TITLE:
+                self.seen[k] = rec[:F_TITLE]
+                n += 1
+        return n
+
+    def iter_seen(self) -> Iterator[Dict[str, Any]]:
+        for k, rec in self.seen.items():
+            yield {
+                "key": k,
+                "first_seen": rec[F_FIRST],
+                "last_seen": rec[F_LAST],
+                "date": _unpack_date(rec[F_DATE]),
+                "source_id": self.sources[rec[F_SOURCE]],
+                "title": rec[F_TITLE] if len(rec) > F_TITLE else None,
+                "link": rec[F_LINK] if len(rec) > F_LINK else None,
+                "label": _unpack_label(rec[F_LABEL]),
+                "score": rec[F_SCORE],
+            }
+
+    def section(self, name: str) -> Dict[str, Any]:
+        if name in ("version", "sources", "seen"):
+            raise KeyError(name)
+        sec = self.data.get(name)
+        if not isinstance(sec, dict):
+            sec = self.data[name] = {}
+        return sec
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        dumps = lambda v: json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write('{"version":%d,"sources":%s' % (STATE_VERSION, dumps(self.sources)))
+            for name, value in self.data.items():
+                if name not in ("version", "sources", "seen"):
+                    f.write(f",\n{dumps(name)}:{dumps(value)}")
+            f.write(',\n"seen":{')
+            # 컬럼마다 한 줄
+            f.write(",\n".join(f"{dumps(name)}:{dumps(col)}" for name, col in _encode_columns(self.seen).items()))
+            f.write("}}\n")
+        os.replace(tmp, path)
+
+def _encode_columns(seen: Dict[str, tuple]) -> Dict[str, Any]:
+    recs = list(seen.values())
+    last = [r[F_LAST] for r in recs]
+    cols: Dict[str, Any] = {
+        "count": len(recs),
+        "keys": "".join(seen),
+        "last_seen": [b - a for a, b in zip([0] + last, last)],
+        "first_age": [r[F_LAST] - r[F_FIRST] for r in recs],
+        "source": [r[F_SOURCE] for r in recs],
+        "date": [r[F_DATE] for r in recs],
+        "label": [r[F_LABEL] for r in recs],
+        "score": [r[F_SCORE] for r in recs],
+    }
+    if any(len(r) > F_TITLE for r in recs):
+        cols["title"] = [r[F_TITLE] if len(r) > F_TITLE else None for r in recs]
+        cols["link"] = [r[F_LINK] if len(r) > F_LINK else None for r in recs]
+    return cols
+
+def _decode_columns(cols: Dict[str, Any]) -> Dict[str, tuple]:
+    n = int(cols.get("count") or 0)
+    keys = cols["keys"]
+    last = list(accumulate(cols["last_seen"]))
+    first = [l - age for l, age in zip(last, cols["first_age"])]
+    fields = [first, last, cols["source"], cols["date"], cols["label"], cols["score"]]
+    if "title" in cols:
+        fields += [cols["title"], cols["link"]]
+    return dict(zip((keys[i:i + KEY_CHARS] for i in range(0, n * KEY_CHARS, KEY_CHARS)), zip(*fields)))
+
+def _upgrade_v1(data: Dict[str, Any]) -> Dict[str, Any]:
+    """v1 (hex keys -> dict records, ISO or epoch timestamps) -> v2, sorted by last_seen."""
+    out = {k: v for k, v in data.items() if k not in ("version", "seen", "seen_sorted")}
+    out.update({"version": STATE_VERSION, "sources": [], "seen": {}})
+    store = JsonStateStore("", out)
+    now = int(datetime.now(timezone.utc).timestamp())
+    recs = []
+    for k, v in (data.get("seen") or {}).items():
+        if not isinstance(v, dict):
             continue
-    for k in to_del:
-        del seen[k]
-    return len(to_del)
+        last = _parse_ts(v.get("last_seen"))
+        first = _parse_ts(v.get("first_seen"))
+        if last is None:
+            last = first if first is not None else now
+        recs.append((last, first if first is not None else last, k, v))
+    recs.sort(key=lambda x: x[0])
+    for last, first, k, v in recs:
+        rec = (first, last, store._intern(v.get("source_id")), _pack_date(v.get("date")),
+               _pack_label(v.get("label")), v.get("score"))
+        if v.get("title") is not None or v.get("link") is not None:
+            rec += (v.get("title"), v.get("link"))
+        store.seen[compact_key(k)] = rec
+    return out
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    key TEXT PRIMARY KEY,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    date TEXT,
+    source_id TEXT,
+    title TEXT,
+    link TEXT,
+    label TEXT,
+    score INTEGER
+);
+CREATE INDEX IF NOT EXISTS seen_last_seen ON seen(last_seen);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_SEEN_COLUMNS = ("date", "source_id", "title", "link", "label", "score")
+
+class SqliteStateStore(StateStore):
+    """
+    Seen entries in an indexed SQLite table (epoch-second timestamps), so a
+    run only touches the keys it looks up. mark_seen is buffered and written
+    in one transaction on save; other sections live in the meta table as JSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # 실행 파이프라인의 여러 스레드가 (잠금 아래 한 번에 하나씩) 사용
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self._compact_keys()
+
+    def _compact_keys(self) -> None:
+        # schema 0 stored full 40-hex keys
+        with self.conn:
+            rows = self.conn.execute("SELECT key FROM seen WHERE length(key) = 40").fetchall()
+            self.conn.executemany(
+                "UPDATE OR REPLACE seen SET key = ? WHERE key = ?",
+                [(compact_key(k), k) for (k,) in rows],
+            )
+            self.conn.execute("PRAGMA user_version = 1")
+
+    def is_seen(self, key: str) -> bool:
+        key = compact_key(key)
+        if key in self._pending:
+            return True
+        return self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def mark_seen(self, key: str, meta: Dict[str, Any]) -> None:
+        rec = self._pending.setdefault(compact_key(key), {})
+        rec.update(meta)
+        rec["last_seen"] = int(datetime.now(timezone.utc).timestamp())
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        rows = [
+            (key, rec["last_seen"], rec["last_seen"], *[rec.get(c) for c in _SEEN_COLUMNS])
+            for key, rec in self._pending.items()
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO seen (key, first_seen, last_seen, date, source_id, title, link, label, score) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET last_seen = excluded.last_seen, date = excluded.date, "
+                "source_id = excluded.source_id, title = excluded.title, link = excluded.link, "
+                "label = excluded.label, score = excluded.score",
+                rows,
+            )
+        self._pending.clear()
+
+    def prune_seen(self, keep_days: int) -> int:
+        self._flush()
+        cutoff = int((datetime.now(timezone.utc) - timedelta(days=keep_days)).timestamp())
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM seen WHERE last_seen < ?", (cutoff,))
+        return cur.rowcount
+
+    def drop_titles(self) -> int:
+        self._flush()
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE seen SET title = NULL, link = NULL WHERE title IS NOT NULL OR link IS NOT NULL"
+            )
+        return cur.rowcount
+
+    def iter_seen(self) -> Iterator[Dict[str, Any]]:
+        self._flush()
+        cols = ("key", "first_seen", "last_seen") + _SEEN_COLUMNS
+        for row in self.conn.execute(f"SELECT {', '.join(cols)} FROM seen ORDER BY last_seen"):
+            yield dict(zip(cols, row))
+
+    def section(self, name: str) -> Dict[str, Any]:
+        if name not in self._sections:
+            row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+            sec = json.loads(row[0]) if row else {}
+            self._sections[name] = sec if isinstance(sec, dict) else {}
+        return self._sections[name]
+
+    def save(self, path: Optional[str] = None) -> None:
+        self._flush()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [(name, json.dumps(sec, ensure_ascii=False)) for name, sec in self._sections.items()],
+            )
 
-def get_last_sent_date(state: Dict[str, Any]) -> Optional[str]:
+    def close(self) -> None:
+        self.conn.close()
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> int:
+    """One-shot copy of a state.json (any version) into a new SQLite store. Returns the number of seen entries."""
+    src = JsonStateStore.load(json_path)
+    dst = SqliteStateStore(db_path)
+    cols = ("key", "first_seen", "last_seen") + _SEEN_COLUMNS
+    rows = [tuple(rec[c] for c in cols) for rec in src.iter_seen()]
+    with dst.conn:
+        dst.conn.executemany(
+            f"INSERT OR REPLACE INTO seen ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+            rows,
+        )
+    for name, sec in src.data.items():
+        if name not in ("version", "sources", "seen") and isinstance(sec, dict):
+            dst.section(name).update(sec)
+    dst.save()
+    dst.close()
+    return len(rows)
+
+def load_state(path: str) -> StateStore:
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        legacy = os.path.splitext(path)[0] + ".json"
+        if not os.path.exists(path) and os.path.exists(legacy):
+            migrate_json_to_sqlite(legacy, path)
+        return SqliteStateStore(path)
+    return JsonStateStore.load(path)
+
+def save_state(path: str, state: StateStore) -> None:
+    state.save(path)
+
+def is_seen(state: StateStore, key: str) -> bool:
+    return state.is_seen(key)
+
+def mark_seen(state: StateStore, key: str, meta: Dict[str, Any]) -> None:
+    state.mark_seen(key, meta)
+
+def prune_seen(state: StateStore, keep_days: int) -> int:
+    return state.prune_seen(keep_days)
+
+def drop_titles(state: StateStore) -> int:
+    return state.drop_titles()
+
+def get_feed_cache(state: StateStore, source_id: str) -> Dict[str, Any]:
+    return state.section("feeds").setdefault(source_id, {})
+
+def get_schedule(state: StateStore, source_id: str) -> Dict[str, Any]:
+    return state.section("schedule").setdefault(source_id, {})
+
+def get_hwm(state: StateStore, source_id: str) -> Dict[str, Any]:
+    return state.section("hwm").setdefault(source_id, {})
+
+def get_retry(state: StateStore) -> Dict[str, Any]:
+    """Entries whose article fetch missed the run budget: seen key -> retry record."""
+    return state.section("retry")
+
+def get_neardup(state: StateStore) -> Dict[str, Any]:
+    """Near-duplicate fingerprints of recently scored entries (see radar.neardup)."""
+    return state.section("neardup")
+
+def get_last_sent_date(state: StateStore) -> Optional[str]:
     try:
-        return state.get("telegram", {}).get("last_sent_date")
+        return state.section("telegram").get("last_sent_date")
     except Exception:
         return None
 
-def set_last_sent_date(state: Dict[str, Any], date_str: str) -> None:
-    state.setdefault("telegram", {})
-    state["telegram"]["last_sent_date"] = date_str
+def set_last_sent_date(state: StateStore, date_str: str) -> None:
+    state.section("telegram")["last_sent_date"] = date_str
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m radar.state")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_mig = sub.add_parser("migrate", help="copy a state.json into a SQLite seen-store")
+    p_mig.add_argument("--from", dest="src", default="state.json")
+    p_mig.add_argument("--to", dest="dst", default="state.sqlite")
+    args = parser.parse_args()
+    if args.cmd == "migrate":
+        if os.path.exists(args.dst):
+            raise SystemExit(f"{args.dst} already exists")
+        n = migrate_json_to_sqlite(args.src, args.dst)
+        print(f"OK: migrated {n} seen entries {args.src} -> {args.dst}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,30 @@
 from __future__ import annotations
-import requests
 from typing import Dict, List
 
+from radar.session import get_session
+
 def build_digest_message(date_str: str, items: List[Dict], max_items_per_section: int, include_green: bool) -> str:
-    red = [x for x in items if x["label"] == "RED"]
-    watch = [x for x in items if x["label"] == "WATCH"]
-    green = [x for x in items if x["label"] == "GREEN"]
+    counts: Dict[str, int] = {}
+    by_label: Dict[str, List[Dict]] = {}
+    for x in items:
+        counts[x["label"]] = counts.get(x["label"], 0) + 1
+        by_label.setdefault(x["label"], []).append(x)
+    return _digest(date_str, counts, by_label, max_items_per_section, include_green)
+
+def build_digest_from_summary(date_str: str, summary: Dict, max_items_per_section: int, include_green: bool) -> str:
+    """Same message from an item-log sidecar (per-label counts + top items), for the whole day."""
+    return _digest(date_str, summary.get("counts") or {}, summary.get("top") or {}, max_items_per_section, include_green)
+
+def _digest(date_str: str, counts: Dict[str, int], top: Dict[str, List[Dict]], max_items_per_section: int, include_green: bool) -> str:
+    n_red, n_watch, n_green = (counts.get(k, 0) for k in ("RED", "WATCH", "GREEN"))
 
     lines = []
     lines.append(f"🛰️ Propaganda Radar — {date_str}")
-    lines.append(f"NEW: {len(items)} | RED {len(red)} | WATCH {len(watch)} | GREEN {len(green)}")
+    lines.append(f"NEW: {sum(counts.values())} | RED {n_red} | WATCH {n_watch} | GREEN {n_green}")
     lines.append("")
 
-    def add_section(tag: str, xs: List[Dict]):
-        if not xs:
+    def add_section(tag: str, xs: List[Dict], n: int):
+        if not n:
             return
         lines.append(tag)
         for i, it in enumerate(xs[:max_items_per_section], 1):
@@ -22,14 +33,14 @@ def build_digest_message(date_str: str, items: List[Dict], max_items_per_section
             lines.append(f"{i}) {title} (score {it.get('score')})")
             if link:
                 lines.append(f"   {link}")
-        if len(xs) > max_items_per_section:
-            lines.append(f"… and {len(xs) - max_items_per_section} more")
+        if n > max_items_per_section:
+            lines.append(f"… and {n - max_items_per_section} more")
         lines.append("")
 
-    add_section("🔴 RED", red)
-    add_section("🟠 WATCH", watch)
+    add_section("🔴 RED", top.get("RED", []), n_red)
+    add_section("🟠 WATCH", top.get("WATCH", []), n_watch)
     if include_green:
-        add_section("🟢 GREEN", green)
+        add_section("🟢 GREEN", top.get("GREEN", []), n_green)
 
     lines.append("—")
     lines.append("Repo의 out/daily/ 파일에서 전체 내용 확인")
@@ -41,5 +52,5 @@ def build_digest_message(date_str: str, items: List[Dict], max_items_per_section
 def send_telegram_message(bot_token: str, chat_id: str, text: str, timeout_sec: int = 20) -> None:
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
     payload = {"chat_id": chat_id, "text": text, "disable_web_page_preview": True}
-    r = requests.post(url, json=payload, timeout=timeout_sec)
+    r = get_session().post(url, json=payload, timeout=timeout_sec)
     r.raise_for_status()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 추적용 쿼리 파라미터는 같은 기사를 다른 URL로 만든다 (BBC: at_medium/at_campaign)
+_TRACKING_PREFIXES = ("utm_", "at_")
+_TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "cmpid"}
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit((url or "").strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PREFIXES) and k.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+def html_hash(html: str) -> str:
+    return hashlib.sha1(html.encode("utf-8", "surrogatepass")).hexdigest()
+
+class ArticleCache:
+    """
+    Extracted article text on disk. u_<sha1(normalized url)>.json points a URL
+    at the hash of the HTML it served; t_<sha1(html)>.json holds trafilatura's
+    output for that HTML (null when nothing was extractable). A URL hit skips
+    the download, a content-hash hit skips extraction. Files older than
+    max_age_days are evicted on lookup and by evict(), which also trims the
+    directory to max_bytes, oldest first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age_days: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_days * 86400
+        self.stats: Dict[str, int] = {"hits": 0, "html_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, prefix: str, digest: str) -> str:
+        return os.path.join(self.directory, f"{prefix}_{digest}.json")
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_sec:
+                os.remove(path)
+                self.stats["evictions"] += 1
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return None
+
+    def _write(self, path: str, data: Dict[str, Any]) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self.stats["writes"] += 1
+
+    def _text_for_hash(self, digest: str) -> Tuple[bool, Optional[str]]:
+        rec = self._read(self._path("t", digest))
+        if rec is None:
+            return False, None
+        return True, rec.get("text")
+
+    def get(self, url: str) -> Tuple[bool, Optional[str]]:
+        """(found, text) for a URL fetched and extracted before."""
+        rec = self._read(self._path("u", hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()))
+        if rec is not None:
+            found, text = self._text_for_hash(str(rec.get("html_sha1") or ""))
+            if found:
+                self.stats["hits"] += 1
+                return True, text
+        self.stats["misses"] += 1
+        return False, None
+
+    def get_by_html(self, url: str, digest: str) -> Tuple[bool, Optional[str]]:
+        """(found, text) for freshly downloaded HTML whose extraction is already cached."""
+        found, text = self._text_for_hash(digest)
+        if found:
+            self.stats["html_hits"] += 1
+            self._link(url, digest)
+        return found, text
+
+    def _link(self, url: str, digest: str) -> None:
+        norm = normalize_url(url)
+        self._write(
+            self._path("u", hashlib.sha1(norm.encode("utf-8")).hexdigest()),
+            {"url": norm, "html_sha1": digest, "fetched_at": int(time.time())},
+        )
+
+    def put(self, url: str, digest: str, text: Optional[str]) -> None:
+        self._write(self._path("t", digest), {"html_sha1": digest, "text": text})
+        self._link(url, digest)
+
+    def evict(self) -> int:
+        now = time.time()
+        files = []
+        for e in os.scandir(self.directory):
+            if not e.is_file() or not e.name.endswith(".json"):
+                continue
+            st = e.stat()
+            if now - st.st_mtime > self.max_age_sec:
+                os.remove(e.path)
+                self.stats["evictions"] += 1
+                continue
+            files.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        self.stats["evictions"] += removed
+        return total
+
+    def summary(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.stats.items())
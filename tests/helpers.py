@@ -0,0 +1,119 @@
+from __future__ import annotations
+import glob
+import os
+import random
+from typing import Dict, List, Optional
+
+from radar.score import ScoreResult
+
+# 테스트 전용 오라클과 픽스처 (radar.bench에는 벤치마크용 사본이 따로 있음)
+
+REPORTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "out", "daily", "daily_*.md")
+
+def load_report_items(pattern: str = REPORTS) -> List[Dict[str, str]]:
+    """Recover title/link/published/excerpt of every item from rendered daily reports."""
+    items: List[Dict[str, str]] = []
+    for path in sorted(glob.glob(pattern)):
+        cur: Optional[Dict[str, str]] = None
+        in_excerpt = False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("### ") and "](" in line:
+                    head, link = line.rsplit("](", 1)
+                    cur = {"title": head.split(". [", 1)[-1], "link": link.rstrip(")"), "published": "", "excerpt": ""}
+                    items.append(cur)
+                    in_excerpt = False
+                elif cur is None:
+                    continue
+                elif line.startswith("- Published: "):
+                    cur["published"] = line[len("- Published: "):]
+                elif line == "**Excerpt**":
+                    in_excerpt = True
+                elif line == "---":
+                    in_excerpt = False
+                elif in_excerpt and line:
+                    cur["excerpt"] = (cur["excerpt"] + "\n\n" + line) if cur["excerpt"] else line
+    return items
+
+def reference_score_item(title, summary, body, keywords, context_rules, mode="aggressive") -> ScoreResult:
+    # The original per-keyword implementation, kept as the oracle for the compiled scorer.
+    def count(text, term):
+        if not text or not term:
+            return 0
+        return text.lower().count(term.lower())
+
+    title = title or ""
+    summary = summary or ""
+    body = body or ""
+    blob = f"{title}\n{summary}\n{body}".strip()
+    aggressive = (mode or "").lower() == "aggressive"
+    total = 0
+    mk, mr = [], []
+    for kw in (keywords or []):
+        term = str(kw.get("term", "")).strip()
+        if not term:
+            continue
+        w = int(kw.get("weight", 1))
+        c_title = count(title, term)
+        c_other = count(summary + "\n" + body, term)
+        c = c_title + c_other
+        if c <= 0:
+            continue
+        if aggressive:
+            part = (c_title * w * 3) + (c_other * w)
+            if c_title > 0:
+                part += 2
+        else:
+            part = c * w
+        part = min(part, w * 12 + (3 if aggressive else 0))
+        total += part
+        mk.append((term, w, c))
+    for rule in (context_rules or []):
+        name = str(rule.get("name", "rule")).strip()
+        patterns = rule.get("patterns", []) or []
+        w = int(rule.get("weight", 1))
+        match_mode = str(rule.get("match", "any")).lower()
+        hits = 0
+        for p in patterns:
+            p = str(p).strip()
+            if p and (p.lower() in blob.lower()):
+                hits += 1
+        ok = (hits > 0) if match_mode == "any" else (hits == len(patterns) and len(patterns) > 0)
+        if ok:
+            add = w * (2 if aggressive else 1)
+            total += add
+            mr.append((name, add))
+    return ScoreResult(score=int(total), matched_keywords=mk, matched_rules=mr)
+
+def random_rules(rng: random.Random, texts: List[str], n_keywords: int, n_rules: int):
+    words = [w for t in texts for w in t.split() if w]
+    joins = [t[max(0, i - 6): i + 8] for t in texts for i in range(len(t)) if t[i] == "\n"][:500] or ["a\nb"]
+
+    def term() -> str:
+        kind = rng.random()
+        if kind < 0.4:
+            t = rng.choice(words)
+        elif kind < 0.6:
+            i = rng.randrange(len(words) - 1)
+            t = words[i] + " " + words[i + 1]
+        elif kind < 0.8:
+            w = rng.choice(words)
+            t = w[: rng.randint(1, max(1, len(w)))]  # prefixes overlap other terms
+        elif kind < 0.9:
+            t = rng.choice(joins)  # straddles a line break, possibly the summary/body join
+        else:
+            t = rng.choice(["aa", "ana", "e", "the", "propaganda", "  traitor ", "", "\n"])
+        return t.upper() if rng.random() < 0.2 else t
+
+    keywords = [{"term": term(), "weight": rng.randint(1, 6)} for _ in range(n_keywords)]
+    rules = [
+        {
+            "name": f"rule{i}",
+            "patterns": [term() for _ in range(rng.randint(0, 4))],
+            "weight": rng.randint(1, 4),
+            "match": rng.choice(["any", "all", "ALL"]),
+        }
+        for i in range(n_rules)
+    ]
+    return keywords, rules
@@ -0,0 +1,60 @@
+from __future__ import annotations
+import hashlib
+import shutil
+
+from radar.bloom import BloomFrontStore
+from radar.state import JsonStateStore, load_state
+
+def _key(i: int) -> str:
+    return hashlib.sha1(f"entry-{i}".encode()).hexdigest()
+
+def _write_state(path: str, keys: range) -> None:
+    st = JsonStateStore(path)
+    for i in keys:
+        st.mark_seen(_key(i), {"source_id": "src", "date": "2026-01-04", "label": "GREEN", "score": 0})
+    st.save()
+
+def test_replaced_state_rebuilds_filter(tmp_path):
+    path = str(tmp_path / "state.json")
+    bloom = f"{path}.bloom"
+    _write_state(path, range(0, 50))
+    BloomFrontStore(load_state(path), bloom).close()
+
+    # state.json swapped under the existing filter (git pull / restore)
+    other = str(tmp_path / "pulled.json")
+    _write_state(other, range(0, 120))
+    shutil.copyfile(other, path)
+
+    st = BloomFrontStore(load_state(path), bloom)
+    assert all(st.is_seen(_key(i)) for i in range(120))
+    assert not any(st.is_seen(_key(i)) for i in range(1000, 1100))
+    st.close()
+
+def test_store_saved_without_filter_update_rebuilds(tmp_path):
+    path = str(tmp_path / "state.json")
+    bloom = f"{path}.bloom"
+    _write_state(path, range(0, 50))
+    st = BloomFrontStore(load_state(path), bloom)
+    st.mark_seen(_key(50), {"source_id": "src"})
+    st.inner.save()  # crash before the filter is updated
+    st.bloom.close()
+
+    st = BloomFrontStore(load_state(path), bloom)
+    assert st.is_seen(_key(50))
+    assert st.stats["definitely_new"] == 0
+    st.close()
+
+def test_unchanged_store_keeps_filter(tmp_path):
+    path = str(tmp_path / "state.json")
+    bloom = f"{path}.bloom"
+    _write_state(path, range(0, 50))
+    st = BloomFrontStore(load_state(path), bloom)
+    st.mark_seen(_key(50), {"source_id": "src"})
+    st.save()
+    stamp = st.bloom.stamp
+    st.close()
+
+    st = BloomFrontStore(load_state(path), bloom)
+    assert st.bloom.stamp == stamp
+    assert st.is_seen(_key(50)) and not st.is_seen(_key(999))
+    st.close()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+import os
+
+from radar.config import load_config
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sources.yaml")
+
+def _rules(cfg):
+    return [
+        (s.id, s.name, s.url, s.policy, s.rule_sets,
+         [(kw.term, kw.term_l, kw.weight, kw.cap) for kw in s.keywords],
+         [(r.name, r.weight, r.match_all, r.patterns) for r in s.context_rules])
+        for s in cfg.sources
+    ]
+
+def test_cached_config_matches_parsed(tmp_path):
+    parsed = load_config(CONFIG, cache_dir=None)
+    load_config(CONFIG, cache_dir=str(tmp_path))  # writes the cache
+    assert [p.endswith(".json") for p in os.listdir(tmp_path)] == [True]
+    cached = load_config(CONFIG, cache_dir=str(tmp_path))
+    assert cached.global_cfg == parsed.global_cfg
+    assert _rules(cached) == _rules(parsed)
+    title, summary = "State propaganda and disinformation", "the regime's state media claims victory"
+    for a, b in zip(parsed.sources, cached.sources):
+        assert a.rules.finalize(a.rules.scan(title, summary), "aggressive") == b.rules.finalize(b.rules.scan(title, summary), "aggressive")
+
+def test_broken_cache_is_ignored(tmp_path):
+    load_config(CONFIG, cache_dir=str(tmp_path))
+    (name,) = os.listdir(tmp_path)
+    with open(tmp_path / name, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert _rules(load_config(CONFIG, cache_dir=str(tmp_path))) == _rules(load_config(CONFIG, cache_dir=None))
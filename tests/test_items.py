@@ -0,0 +1,89 @@
+from __future__ import annotations
+import random
+from typing import Dict, List
+
+from radar.items import ItemLog, sort_key
+from radar.telegram import build_digest_from_summary, build_digest_message
+
+LABELS = ["RED", "WATCH", "GREEN"]
+
+def _random_run(rng: random.Random, start: int) -> List[Dict]:
+    items = []
+    for j in range(rng.choice([0, 1, 3, 10, 25])):
+        n = start + j
+        items.append({
+            "title": f"Item {n}" + ("\nsecond line" if rng.random() < 0.1 else ""),
+            "link": f"https://example.com/{n}" if rng.random() < 0.9 else "",
+            "score": rng.randint(0, 12),  # 동점이 많도록 좁은 범위
+            "label": rng.choice(LABELS),
+            "key": f"k{n}",
+        })
+    return sorted(items, key=sort_key)
+
+def test_merged_runs_and_sidecar_match_whole_day(tmp_path):
+    rng = random.Random(0)
+    for case in range(200):
+        log = ItemLog(str(tmp_path / f"case{case}"))
+        top_k = rng.choice([1, 3, 8])
+        logged: List[Dict] = []
+        for _ in range(rng.randint(1, 5)):
+            run = _random_run(rng, len(logged))
+            meta = log.append("2026-01-04", run, top_k=top_k)
+            logged.extend(run)
+
+        whole = sorted(logged, key=sort_key)
+        assert list(log.merged("2026-01-04")) == whole
+        counts: Dict[str, int] = {}
+        for it in logged:
+            counts[it["label"]] = counts.get(it["label"], 0) + 1
+        assert meta["counts"] == counts
+        for label in LABELS:
+            first = [{"title": it["title"], "link": it["link"], "score": it["score"]} for it in whole if it["label"] == label][:top_k]
+            assert meta["top"].get(label, []) == first
+
+def test_digest_from_sidecar_matches_item_list(tmp_path):
+    rng = random.Random(1)
+    for case in range(300):
+        log = ItemLog(str(tmp_path / f"case{case}"))
+        max_items = rng.choice([1, 3, 8])
+        include_green = rng.random() < 0.5
+        logged: List[Dict] = []
+        meta = log.append("2026-01-04", [], top_k=max_items)
+        for _ in range(rng.randint(1, 4)):
+            run = _random_run(rng, len(logged))
+            meta = log.append("2026-01-04", run, top_k=max_items)
+            logged.extend(run)
+        expected = build_digest_message("2026-01-04", sorted(logged, key=sort_key), max_items, include_green)
+        assert build_digest_from_summary("2026-01-04", meta, max_items, include_green) == expected
+
+def test_sidecar_out_of_sync_with_log_is_rebuilt(tmp_path):
+    rng = random.Random(2)
+    log = ItemLog(str(tmp_path))
+    first = _random_run(rng, 0) or [{"title": "x", "link": "", "score": 1, "label": "GREEN", "key": "k0"}]
+    log.append("2026-01-04", first)
+    with open(log.meta_path("2026-01-04"), "r", encoding="utf-8") as f:
+        old_meta = f.read()
+
+    # crash after the data append, before the sidecar was replaced
+    second = _random_run(rng, 100) or [{"title": "x", "link": "", "score": 1, "label": "RED", "key": "k100"}]
+    log.append("2026-01-04", second)
+    with open(log.meta_path("2026-01-04"), "w", encoding="utf-8") as f:
+        f.write(old_meta)
+    assert log.meta("2026-01-04") is None
+
+    whole = sorted(first + second, key=sort_key)
+    assert list(log.merged("2026-01-04")) == whole
+    meta = log.meta("2026-01-04")
+    assert meta is not None and sum(meta["counts"].values()) == len(whole)
+
+def test_torn_last_line_is_dropped(tmp_path):
+    rng = random.Random(3)
+    log = ItemLog(str(tmp_path))
+    run = _random_run(rng, 0) or [{"title": "x", "link": "", "score": 1, "label": "GREEN", "key": "k0"}]
+    log.append("2026-01-04", run)
+    with open(log.path("2026-01-04"), "a", encoding="utf-8") as f:
+        f.write('{"title":"half')
+    assert log.read("2026-01-04") == run
+    more = [{"title": "y", "link": "", "score": 2, "label": "WATCH", "key": "k200"}]
+    log.append("2026-01-04", more)
+    assert list(log.merged("2026-01-04")) == sorted(run + more, key=sort_key)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+import hashlib
+
+from radar.neardup import NearDupIndex
+from radar.state import compact_key
+
+TITLE = "Officials deny reports of troop movements near the northern border crossing"
+SUMMARY = "The ministry called the claims a provocation spread by foreign media outlets."
+
+def _key(name: str) -> str:
+    return hashlib.sha1(name.encode()).hexdigest()
+
+def test_match_carries_report_date_not_text():
+    section = {}
+    idx = NearDupIndex(section)
+    fp = idx.fingerprint(TITLE, SUMMARY)
+    idx.add(_key("a"), fp, "src_a", "2026-01-04")
+    assert section[compact_key(_key("a"))][2:] == ["src_a", "2026-01-04"]
+
+    dup = idx.find(idx.fingerprint(TITLE + ".", SUMMARY), _key("b"))
+    assert dup is not None
+    assert (dup["key"], dup["source_id"], dup["date"]) == (compact_key(_key("a")), "src_a", "2026-01-04")
+    assert idx.find(fp, _key("a")) is None  # never matches itself
+
+def test_old_records_drop_title_and_link():
+    fp = NearDupIndex({}).fingerprint(TITLE, SUMMARY)
+    ck = compact_key(_key("a"))
+    section = {ck: [fp, 1767521483, "src_a", "a title", "https://example.com/a"]}
+    idx = NearDupIndex(section)
+    assert section[ck] == [fp, 1767521483, "src_a"]
+    dup = idx.find(fp, _key("b"))
+    assert dup is not None and dup["date"] is None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import io
+import random
+import re
+from typing import Dict, List
+
+import pytest
+
+from helpers import load_report_items
+from radar.items import sort_key
+from radar.render import render_daily_markdown, write_daily_file, write_daily_markdown
+
+_GENERATED = re.compile(r"^- Generated: .*$", re.M)
+
+def _reference_render(date_str: str, items: List[Dict], include_green: bool) -> str:
+    # The list-building renderer the streaming one replaced, kept as the oracle.
+    now = "-"
+    red = [x for x in items if x["label"] == "RED"]
+    watch = [x for x in items if x["label"] == "WATCH"]
+    green = [x for x in items if x["label"] == "GREEN"]
+
+    def section(title: str, xs: List[Dict]) -> str:
+        lines = [f"## {title} ({len(xs)})", ""]
+        for i, it in enumerate(xs, 1):
+            lines.append(f"### {i}. [{it['title']}]({it['link']})")
+            lines.append(f"- Source: **{it['source_name']}** (`{it['source_id']}`)")
+            if it.get("published"):
+                lines.append(f"- Published: {it['published']}")
+            lines.append(f"- Policy Used: `{it.get('policy_used','RSS_ONLY')}` | Score: **{it['score']}** | Label: **{it['label']}**")
+            if it.get("matches"):
+                lines.append(f"- Matches: {it['matches']}")
+            lines.append("")
+            if it.get("excerpt"):
+                lines.append("**Excerpt**")
+                lines.append("")
+                lines.append(it["excerpt"])
+                lines.append("")
+            lines.append("---")
+            lines.append("")
+        return "\n".join(lines)
+
+    out = []
+    out.append(f"# Propaganda Radar Daily — {date_str}")
+    out.append("")
+    out.append(f"- Generated: {now}")
+    out.append(f"- New Items: {len(items)} | RED: {len(red)} | WATCH: {len(watch)} | GREEN: {len(green)}")
+    out.append("")
+    out.append(section("🔴 RED", red))
+    out.append(section("🟠 WATCH", watch))
+    if include_green:
+        out.append(section("🟢 GREEN", green))
+    return "\n".join(out)
+
+def _normalize(md: str) -> str:
+    return _GENERATED.sub("- Generated: -", md)
+
+def _random_items(rng: random.Random, pool: List[Dict[str, str]]) -> List[Dict]:
+    # 빈 섹션, 모르는 라벨, published/matches/excerpt 없는 항목까지 섞음
+    labels = rng.choice([["RED", "WATCH", "GREEN"], ["RED"], ["WATCH", "GREEN"], ["GREEN", "UNKNOWN"], ["RED", "WATCH", "GREEN", "UNKNOWN"]])
+    items = []
+    for j in range(rng.choice([0, 1, 2, 5, 20, 60])):
+        src = rng.choice(pool)
+        items.append({
+            "title": src["title"],
+            "link": src["link"],
+            "source_name": f"Source {j % 3}",
+            "source_id": f"src_{j % 3}",
+            "published": src["published"] if rng.random() < 0.7 else "",
+            "policy_used": rng.choice(["RSS_ONLY", "LEAD_3_PARAGRAPHS", "FULL_TEXT"]),
+            "score": rng.randint(0, 40),
+            "label": rng.choice(labels),
+            "matches": rng.choice(["", "propaganda×2(w4)", "propaganda×1(w4), rule:state_media(+6)"]),
+            "excerpt": src["excerpt"] if rng.random() < 0.6 else "",
+        })
+    return items
+
+@pytest.fixture(scope="module")
+def pool():
+    items = load_report_items()
+    assert items, "no items found under out/daily/"
+    return items
+
+def test_streamed_report_matches_reference(pool, tmp_path):
+    rng = random.Random(0)
+    path = str(tmp_path / "daily.md")
+    for _ in range(500):
+        items = _random_items(rng, pool)
+        include_green = rng.random() < 0.5
+        expected = _reference_render("2026-01-04", items, include_green)
+
+        assert _normalize(render_daily_markdown("2026-01-04", items, include_green)) == expected
+
+        # main()처럼: 정렬된 스트림 + counts
+        counts: Dict[str, int] = {}
+        for it in items:
+            counts[it["label"]] = counts.get(it["label"], 0) + 1
+        write_daily_file(path, "2026-01-04", iter(sorted(items, key=sort_key)), include_green, counts)
+        with open(path, "r", encoding="utf-8") as f:
+            streamed = f.read()
+        # 같은 라벨 안의 순서는 정렬 기준을 따름
+        by_label = sorted(items, key=sort_key)
+        assert _normalize(streamed) == _reference_render("2026-01-04", by_label, include_green)
+
+def test_ungrouped_stream_is_rejected():
+    items = [{"title": "a", "link": "", "source_name": "", "source_id": "", "score": 1, "label": label}
+             for label in ("WATCH", "RED")]
+    with pytest.raises(ValueError):
+        write_daily_markdown(io.StringIO(), "2026-01-04", items, True, {"RED": 1, "WATCH": 1})
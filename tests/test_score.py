@@ -0,0 +1,39 @@
+from __future__ import annotations
+import random
+
+import pytest
+
+from helpers import load_report_items, random_rules, reference_score_item
+from radar.score import AUTOMATON_MIN_TERMS, ScoreResult, _Automaton, _TermCounter, compile_rules, score_batch
+
+@pytest.fixture(scope="module")
+def docs():
+    rng = random.Random(0)
+    out = []
+    for it in load_report_items():
+        text = it["excerpt"][:3000]
+        cut = rng.randint(0, len(text))
+        out.append((it["title"], text[:cut], text[cut:]))
+    assert out, "no items found under out/daily/"
+    return out
+
+@pytest.mark.parametrize("n_keywords, rounds, matcher", [
+    (40, 20, _TermCounter),
+    (2 * AUTOMATON_MIN_TERMS, 5, _Automaton),
+])
+def test_compiled_scorer_matches_reference(docs, n_keywords, rounds, matcher):
+    # random keyword/rule sets drawn from report text: RSS pass, body re-score and score_batch
+    rng = random.Random(n_keywords)
+    for _ in range(rounds):
+        sample = rng.sample(docs, 40)
+        keywords, rules = random_rules(rng, [t for d in sample for t in d], n_keywords, 12)
+        mode = rng.choice(["aggressive", "balanced", "AGGRESSIVE"])
+        compiled = compile_rules(keywords, rules)
+        assert isinstance(compiled.matcher, matcher)
+        batch = score_batch(sample, compiled, mode)
+        for i, (title, summary, body) in enumerate(sample):
+            partial = compiled.scan(title, summary)
+            assert compiled.finalize(partial, mode) == reference_score_item(title, summary, "", keywords, rules, mode)
+            expected = reference_score_item(title, summary, body, keywords, rules, mode)
+            assert compiled.finalize(compiled.extend(partial, body), mode) == expected
+            assert ScoreResult(batch.scores[i], batch.matched_keywords(i), batch.matched_rules(i)) == expected